@@ -0,0 +1,83 @@
+"""
+🖼️ Normalisation des images de couverture (exécutée dans un ProcessPoolExecutor par publisher_api)
+Décode, réduit à une dimension max et ré-encode en WebP/JPEG sous un budget d'octets.
+Module volontairement sans dépendance au bot : importé tel quel par les processus workers.
+"""
+import io
+from typing import Optional, Tuple
+
+try:
+    from PIL import Image, ImageOps
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+# Formats acceptés tels quels par Discord (les autres sont toujours convertis)
+PASSTHROUGH_FORMATS = {"PNG", "JPEG", "WEBP", "GIF"}
+# Qualités essayées dans l'ordre, puis réduction de la taille si le budget n'est toujours pas tenu
+QUALITY_STEPS = (85, 75, 65, 50)
+MAX_SHRINK_STEPS = 4
+SHRINK_FACTOR = 0.75
+
+# Format de sortie -> (format Pillow, extension, content type)
+OUTPUT_FORMATS = {
+    "webp": ("WEBP", ".webp", "image/webp"),
+    "jpeg": ("JPEG", ".jpg", "image/jpeg"),
+}
+
+
+def _encode(img, pil_format: str, quality: int) -> bytes:
+    buf = io.BytesIO()
+    if pil_format == "JPEG":
+        img.save(buf, format="JPEG", quality=quality, optimize=True, progressive=True)
+    else:
+        img.save(buf, format="WEBP", quality=quality, method=4)
+    return buf.getvalue()
+
+
+def normalize_image(data: bytes, max_dimension: int, max_bytes: int, output_format: str) -> Optional[Tuple[bytes, str, str]]:
+    """
+    Returns:
+        (octets ré-encodés, extension, content type), ou None si l'image d'origine convient déjà
+        (format accepté, dimensions et poids dans les limites), est animée ou illisible.
+    """
+    if not PIL_AVAILABLE:
+        return None
+    pil_format, ext, content_type = OUTPUT_FORMATS.get(output_format, OUTPUT_FORMATS["webp"])
+    try:
+        img = Image.open(io.BytesIO(data))
+        source_format = img.format
+        # GIF/WebP animés : ré-encoder perdrait l'animation
+        if getattr(img, "is_animated", False):
+            return None
+        if (source_format in PASSTHROUGH_FORMATS and len(data) <= max_bytes
+                and max(img.size) <= max_dimension):
+            return None
+        img = ImageOps.exif_transpose(img)
+        if pil_format == "JPEG":
+            # JPEG sans transparence : fond blanc sous le canal alpha
+            if img.mode in ("RGBA", "LA", "P"):
+                img = img.convert("RGBA")
+                background = Image.new("RGB", img.size, (255, 255, 255))
+                background.paste(img, mask=img.getchannel("A"))
+                img = background
+            elif img.mode != "RGB":
+                img = img.convert("RGB")
+        elif img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA")
+
+        img.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+        out = b""
+        for _ in range(MAX_SHRINK_STEPS + 1):
+            for quality in QUALITY_STEPS:
+                out = _encode(img, pil_format, quality)
+                if len(out) <= max_bytes:
+                    return out, ext, content_type
+            width, height = img.size
+            img = img.resize((max(1, int(width * SHRINK_FACTOR)), max(1, int(height * SHRINK_FACTOR))), Image.LANCZOS)
+        # Budget intenable : meilleur effort, sauf si plus lourd qu'un original déjà accepté par Discord
+        if source_format in PASSTHROUGH_FORMATS and len(out) >= len(data):
+            return None
+        return out, ext, content_type
+    except Exception:
+        return None
@@ -33,9 +33,16 @@ from publisher_api import (
     options_handler,
     configure,
     forum_post,
+    forum_post_batch,
     forum_post_update,
+    forum_post_update_batch,
     forum_post_delete,
     get_history,
+    get_job,
+    http_sessions as publisher_http_sessions,
+    publish_jobs as publisher_jobs,
+    announcement_outbox as publisher_announcements,
+    image_normalizer as publisher_image_normalizer,
     _with_cors,
 )
 
@@ -112,9 +119,18 @@ def make_app():
     # Forum post
     app.router.add_post("/api/forum-post", forum_post)
 
+    # Forum post batch (publication de plusieurs traductions en une requête)
+    app.router.add_post("/api/forum-post/batch", forum_post_batch)
+
+    # Statut d'un job de publication asynchrone (/api/forum-post?async=1)
+    app.router.add_get("/api/jobs/{job_id}", get_job)
+
     # Forum post update
     app.router.add_post("/api/forum-post/update", forum_post_update)
 
+    # Forum post update batch (MAJ en masse silencieuse, progression NDJSON)
+    app.router.add_post("/api/forum-post/update/batch", forum_post_update_batch)
+
     # Forum post delete (thread Discord + historique/Supabase côté frontend)
     app.router.add_post("/api/forum-post/delete", forum_post_delete)
 
@@ -328,6 +344,13 @@ async def start():
     await asyncio.get_event_loop().run_in_executor(None, _init_supabase)
     logger.info("✅ Client Supabase prêt")
 
+    # Sessions HTTP partagées (Discord REST, F95, images) : keep-alive réutilisé par toutes les requêtes API
+    await publisher_http_sessions.start()
+    # Jobs de publication asynchrones : reprise des jobs en file avant le redémarrage
+    await publisher_jobs.start()
+    # Outbox des annonces : livraison en arrière-plan des annonces restées en attente
+    await publisher_announcements.start()
+
     # 3) Démarrage séquentiel : Bot2 -> PublisherBot
     # Chaque bot doit être ready avant de lancer le suivant
 
@@ -397,13 +420,24 @@ async def start():
     await asyncio.gather(frelon_task, pub_task, return_exceptions=True)
 
 
+async def run():
+    """Lance l'orchestrateur puis arrête les workers (jobs, annonces) et ferme les sessions HTTP partagées."""
+    try:
+        await start()
+    finally:
+        await publisher_jobs.close()
+        await publisher_announcements.close()
+        publisher_image_normalizer.close()
+        await publisher_http_sessions.close()
+
+
 if __name__ == "__main__":
     try:
         # API Discord officielle pour tous les bots — le serveur Oracle communique en direct
         Route.BASE = "https://discord.com/api/v10"
         logger.info("🛡️  Configuration : Bots et API en direct vers Discord.")
 
-        asyncio.run(start())
+        asyncio.run(run())
     except KeyboardInterrupt:
         logger.info("🛑 Arrêt de l'orchestrateur (KeyboardInterrupt)")
     except Exception as e:
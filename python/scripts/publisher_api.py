@@ -16,8 +16,12 @@ import logging
 import datetime
 import random
 import re
-from datetime import datetime as dt
-from typing import Optional, Tuple, List, Dict
+import hashlib
+import sqlite3
+import contextlib
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple, List, Dict, AsyncIterator, Awaitable, Callable
 from pathlib import Path
 from zoneinfo import ZoneInfo
 
@@ -25,6 +29,8 @@ import aiohttp
 from aiohttp import web
 from dotenv import load_dotenv
 
+import image_normalize
+
 # ==================== LOGGING ====================
 logging.basicConfig(
     level=logging.INFO,
@@ -133,6 +139,40 @@ def _fetch_post_by_thread_id_sync(thread_id) -> Optional[Dict]:
     return None
 
 
+# Nombre de thread_id par requête in_() (longueur d'URL PostgREST raisonnable)
+_SUPABASE_IN_CHUNK_SIZE = 150
+
+
+def _fetch_posts_by_thread_ids_sync(thread_ids) -> Dict[str, Optional[Dict]]:
+    """
+    Récupère en masse les lignes published_posts pour une liste de thread_id (requêtes in_() paginées).
+    Retourne {thread_id: row} ; les thread_id interrogés sans ligne valent None.
+    Les thread_id d'un bloc en échec sont absents du dict (l'appelant peut refaire une requête unitaire).
+    """
+    sb = _get_supabase()
+    if not sb or not thread_ids:
+        return {}
+    ids = list(dict.fromkeys(str(t) for t in thread_ids if t))
+    rows: Dict[str, Optional[Dict]] = {}
+    for i in range(0, len(ids), _SUPABASE_IN_CHUNK_SIZE):
+        chunk = ids[i:i + _SUPABASE_IN_CHUNK_SIZE]
+        try:
+            r = sb.table("published_posts").select("*").in_("thread_id", chunk).order("updated_at", desc=True).execute()
+        except Exception as e:
+            logger.warning(f"⚠️ Supabase fetch_posts_by_thread_ids (bloc {i // _SUPABASE_IN_CHUNK_SIZE + 1}): {e}")
+            continue
+        for tid in chunk:
+            rows[tid] = None
+        # Tri updated_at DESC : on garde la ligne la plus récente par thread_id
+        for row in (r.data or []):
+            tid = str(row.get("thread_id") or "")
+            if tid in rows and rows[tid] is None:
+                rows[tid] = row
+    found = sum(1 for v in rows.values() if v)
+    logger.info(f"🗄️ Supabase: {found}/{len(ids)} posts préchargés par thread_id")
+    return rows
+
+
 def _parse_saved_inputs(row: Dict) -> Dict:
     """Retourne saved_inputs comme dict (parse si Supabase renvoie une chaîne json)."""
     raw = row.get("saved_inputs")
@@ -202,7 +242,48 @@ class Config:
         self.VERSION_CHECK_MINUTE = int(os.getenv("VERSION_CHECK_MINUTE", "0"))
         self.CLEANUP_EMPTY_MESSAGES_HOUR = int(os.getenv("CLEANUP_EMPTY_MESSAGES_HOUR", "4"))
         self.CLEANUP_EMPTY_MESSAGES_MINUTE = int(os.getenv("CLEANUP_EMPTY_MESSAGES_MINUTE", "0"))
-        
+        # Nettoyage temps réel (on_message) des messages vides / « titre changé » du forum ; le balayage nocturne reste en filet de sécurité
+        self.REALTIME_CLEANUP_ENABLED = os.getenv("REALTIME_CLEANUP_ENABLED", "false").strip().lower() in ("true", "1", "yes")
+
+        # API F95 checker.php : "concurrent" (blocs de 100 en parallèle) ou "sequential" (ancien mode, blocs de 50 + pause 1s)
+        self.F95_CHECKER_MODE = (os.getenv("F95_CHECKER_MODE", "concurrent") or "concurrent").strip().lower()
+        self.F95_CHECKER_CHUNK_SIZE = min(100, max(1, int(os.getenv("F95_CHECKER_CHUNK_SIZE", "100"))))
+        self.F95_CHECKER_CONCURRENCY = max(1, int(os.getenv("F95_CHECKER_CONCURRENCY", "4")))
+        self.F95_CHECKER_MAX_RETRIES = max(0, int(os.getenv("F95_CHECKER_MAX_RETRIES", "3")))
+
+        # Pool de MAJ des posts (contrôle versions) : workers en parallèle + budget MAJ/s partagé
+        self.VERSION_UPDATE_CONCURRENCY = max(1, int(os.getenv("VERSION_UPDATE_CONCURRENCY", "4")))
+        self.VERSION_UPDATE_RATE = max(0.0, float(os.getenv("VERSION_UPDATE_RATE", "2")))
+
+        # Cache des threads archivés : scan complet forcé au-delà de cet âge (0 = jamais)
+        self.FORUM_THREAD_CACHE_FULL_REFRESH_HOURS = max(0, int(os.getenv("FORUM_THREAD_CACHE_FULL_REFRESH_HOURS", "168")))
+
+        # Cache des tags de forum (nom -> id) : durée de vie en secondes (invalidé aussi par la gateway)
+        self.FORUM_TAG_CACHE_TTL_SECONDS = max(0, int(os.getenv("FORUM_TAG_CACHE_TTL_SECONDS", "3600")))
+
+        # Jobs de publication asynchrones (/api/forum-post?async=1) : workers en parallèle
+        self.PUBLISH_JOB_CONCURRENCY = max(1, int(os.getenv("PUBLISH_JOB_CONCURRENCY", "2")))
+        # Clés d'idempotence (Idempotency-Key) : durée de conservation des réponses rejouées
+        self.IDEMPOTENCY_TTL_HOURS = max(1, int(os.getenv("IDEMPOTENCY_TTL_HOURS", "24")))
+        # Publication par lot (/api/forum-post/batch) : threads créés en parallèle (cadence via rate_limiter)
+        self.BATCH_PUBLISH_CONCURRENCY = max(1, int(os.getenv("BATCH_PUBLISH_CONCURRENCY", "4")))
+        # MAJ en masse (/api/forum-post/update/batch) : workers en parallèle
+        self.BATCH_UPDATE_CONCURRENCY = max(1, int(os.getenv("BATCH_UPDATE_CONCURRENCY", "4")))
+        # Outbox des annonces : nombre d'essais avant abandon (délai exponentiel entre essais)
+        self.ANNOUNCEMENT_MAX_ATTEMPTS = max(1, int(os.getenv("ANNOUNCEMENT_MAX_ATTEMPTS", "8")))
+        # Cache disque des images de couverture : activé, taille max, fraîcheur par défaut (sans Cache-Control)
+        self.IMAGE_CACHE_ENABLED = os.getenv("IMAGE_CACHE_ENABLED", "true").strip().lower() in ("true", "1", "yes")
+        self.IMAGE_CACHE_MAX_MB = max(1, int(os.getenv("IMAGE_CACHE_MAX_MB", "256")))
+        self.IMAGE_CACHE_FRESH_SECONDS = max(0, int(os.getenv("IMAGE_CACHE_FRESH_SECONDS", "86400")))
+        # Normalisation des images avant upload (Pillow requis) : dimension max, budget en Ko, format webp|jpeg
+        self.IMAGE_NORMALIZE_ENABLED = os.getenv("IMAGE_NORMALIZE_ENABLED", "false").strip().lower() in ("true", "1", "yes")
+        self.IMAGE_NORMALIZE_MAX_DIMENSION = max(64, int(os.getenv("IMAGE_NORMALIZE_MAX_DIMENSION", "1920")))
+        self.IMAGE_NORMALIZE_MAX_KB = max(16, int(os.getenv("IMAGE_NORMALIZE_MAX_KB", "1024")))
+        self.IMAGE_NORMALIZE_FORMAT = (os.getenv("IMAGE_NORMALIZE_FORMAT", "webp") or "webp").strip().lower()
+        self.IMAGE_NORMALIZE_WORKERS = max(1, int(os.getenv("IMAGE_NORMALIZE_WORKERS", "2")))
+        # MAJ d'un post : délai max par étape (message, metadata, thread, annonce, Supabase ; 0 = sans limite)
+        self.UPDATE_STEP_TIMEOUT_SECONDS = max(0.0, float(os.getenv("UPDATE_STEP_TIMEOUT_SECONDS", "60")))
+
         self.configured = bool(
             self.PUBLISHER_DISCORD_TOKEN and
             self.FORUM_MY_ID and
@@ -273,33 +354,79 @@ def _build_thread_title_with_version(thread_name: str, new_version: str) -> str:
     return new_title or thread_name
 
 # ==================== STOCKAGE ANTI-DOUBLON ====================
-# Structure: {thread_id: {"f95_version": "Ch.7", "timestamp": datetime}}
-_notified_versions: Dict[int, Dict] = {}
+# SQLite (WAL) : survit aux redémarrages systemd (Restart=always), expiration faite en SQL.
+# Table: notified_versions(thread_id PRIMARY KEY, f95_version, notified_at)
+NOTIFIED_VERSIONS_DB = Path("notified_versions.db")
+NOTIFIED_VERSIONS_TTL_DAYS = 30
+
+
+class NotifiedVersionsStore:
+    def __init__(self, db_file: Path = NOTIFIED_VERSIONS_DB):
+        self.db_file = db_file
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(str(self.db_file), isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS notified_versions ("
+                " thread_id INTEGER PRIMARY KEY,"
+                " f95_version TEXT NOT NULL,"
+                " notified_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_notified_versions_notified_at ON notified_versions (notified_at)")
+            self._conn = conn
+        return self._conn
+
+    def is_notified(self, thread_id: int, f95_version: str) -> bool:
+        cutoff = time.time() - NOTIFIED_VERSIONS_TTL_DAYS * 86400
+        row = self._db().execute(
+            "SELECT 1 FROM notified_versions WHERE thread_id = ? AND f95_version = ? AND notified_at >= ?",
+            (int(thread_id), f95_version, cutoff)
+        ).fetchone()
+        return row is not None
+
+    def mark(self, thread_id: int, f95_version: str) -> None:
+        self._db().execute(
+            "INSERT INTO notified_versions (thread_id, f95_version, notified_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(thread_id) DO UPDATE SET f95_version = excluded.f95_version, notified_at = excluded.notified_at",
+            (int(thread_id), f95_version, time.time())
+        )
+
+    def purge_expired(self) -> int:
+        cutoff = time.time() - NOTIFIED_VERSIONS_TTL_DAYS * 86400
+        return self._db().execute("DELETE FROM notified_versions WHERE notified_at < ?", (cutoff,)).rowcount
+
+
+notified_store = NotifiedVersionsStore()
+
 
 def _clean_old_notifications():
     """Nettoie les entrées de plus de 30 jours"""
-    cutoff = dt.now() - datetime.timedelta(days=30)
-    to_remove = [
-        tid for tid, data in _notified_versions.items()
-        if data.get("timestamp", dt.min) < cutoff
-    ]
-    for tid in to_remove:
-        del _notified_versions[tid]
-    if to_remove:
-        logger.info(f"🧹 Nettoyage anti-doublon: {len(to_remove)} entrées supprimées")
+    try:
+        removed = notified_store.purge_expired()
+    except Exception as e:
+        logger.warning(f"⚠️ Nettoyage anti-doublon impossible: {e}")
+        return
+    if removed:
+        logger.info(f"🧹 Nettoyage anti-doublon: {removed} entrées supprimées")
 
 def _is_already_notified(thread_id: int, f95_version: str) -> bool:
     """Vérifie si cette version a déjà été notifiée pour ce thread"""
-    if thread_id not in _notified_versions:
+    try:
+        return notified_store.is_notified(thread_id, f95_version)
+    except Exception as e:
+        logger.warning(f"⚠️ Lecture anti-doublon impossible (thread {thread_id}): {e}")
         return False
-    return _notified_versions[thread_id].get("f95_version") == f95_version
 
 def _mark_as_notified(thread_id: int, f95_version: str):
     """Marque cette version comme notifiée"""
-    _notified_versions[thread_id] = {
-        "f95_version": f95_version,
-        "timestamp": dt.now()
-    }
+    try:
+        notified_store.mark(thread_id, f95_version)
+    except Exception as e:
+        logger.warning(f"⚠️ Écriture anti-doublon impossible (thread {thread_id}): {e}")
 
 # ==================== HISTORIQUE PUBLICATIONS ====================
 # Aligné sur Supabase : tous les champs (saved_inputs, saved_link_configs, etc.) sont stockés et renvoyés.
@@ -318,6 +445,8 @@ def _normalize_history_row(row: Dict) -> Dict:
         "savedAdditionalTranslationLinks": "saved_additional_translation_links",
         "savedAdditionalModLinks": "saved_additional_mod_links", "templateId": "template_id",
         "createdAt": "created_at", "updatedAt": "updated_at",
+        "metadataMessageId": "metadata_message_id", "imageHash": "image_hash",
+        "contentHash": "content_hash", "imageUrl": "image_url",
     }
     out = dict(row)
     for camel, snake in alias.items():
@@ -345,7 +474,11 @@ class PublicationHistory:
         Si post_data a thread_id et qu'un post avec ce thread_id existe, il est remplacé ; sinon insertion en tête.
         Tous les champs (saved_inputs, saved_link_configs, etc.) sont conservés tels quels.
         """
-        post_data = _normalize_history_row(post_data)
+        self.update_or_add_posts([post_data])
+
+    def update_or_add_posts(self, posts: List[Dict]) -> None:
+        """Comme update_or_add_post pour plusieurs posts, en une seule lecture/écriture du fichier."""
+        posts = [_normalize_history_row(p) for p in posts]
         try:
             if self.history_file.exists():
                 content = self.history_file.read_text(encoding='utf-8')
@@ -353,10 +486,10 @@ class PublicationHistory:
             else:
                 history = []
 
-            thread_id = post_data.get("thread_id") or ""
-            if thread_id:
-                history = [p for p in history if (p.get("thread_id") or "") != thread_id]
-            history.insert(0, post_data)
+            thread_ids = {p.get("thread_id") for p in posts if p.get("thread_id")}
+            if thread_ids:
+                history = [p for p in history if (p.get("thread_id") or "") not in thread_ids]
+            history[:0] = reversed(posts)
             if len(history) > 1000:
                 history = history[:1000]
 
@@ -364,7 +497,10 @@ class PublicationHistory:
                 json.dumps(history, ensure_ascii=False, indent=2),
                 encoding='utf-8'
             )
-            logger.info(f"✅ Post enregistré dans l'historique: {post_data.get('title', 'N/A')}")
+            if len(posts) == 1:
+                logger.info(f"✅ Post enregistré dans l'historique: {posts[0].get('title', 'N/A')}")
+            else:
+                logger.info(f"✅ {len(posts)} posts enregistrés dans l'historique")
         except Exception as e:
             logger.error(f"Erreur lors de l'enregistrement dans l'historique: {e}")
 
@@ -385,6 +521,13 @@ class PublicationHistory:
             logger.error(f"Erreur lors de la lecture de l'historique: {e}")
             return []
     
+    def find_by_thread_id(self, thread_id) -> Optional[Dict]:
+        """Retourne le post local pour ce thread_id, ou None."""
+        for p in self.get_posts():
+            if (p.get("thread_id") or "") == str(thread_id):
+                return p
+        return None
+
     def delete_post(self, thread_id: str = None, post_id: str = None) -> bool:
         """
         Supprime un post de l'historique local (JSON) par thread_id ou id.
@@ -429,33 +572,1033 @@ class PublicationHistory:
 
 history_manager = PublicationHistory()
 
-# ==================== RATE LIMIT TRACKER ====================
-class RateLimitTracker:
+# ==================== INDEX THREAD → F95 ====================
+# Index persistant (à côté de publication_history.json) pour éviter de re-parser chaque post au contrôle quotidien.
+# Structure: {thread_id: {"f95_id", "post_version", "content_hash", "updated_at", "last_seen"}}
+THREAD_INDEX_FILE = HISTORY_FILE.with_name("thread_f95_index.json")
+
+
+def _post_content_hash(content: str, saved_version: str, thread_name: str) -> str:
+    """Empreinte des champs dont dépend l'extraction (lien + version) d'un post."""
+    raw = "\x1f".join([content or "", saved_version or "", thread_name or ""])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _row_content_hash(row: Optional[Dict], thread_name: str) -> str:
+    """Empreinte d'une ligne published_posts (ou du seul nom de thread si absente)."""
+    if not row:
+        return _post_content_hash("", "", thread_name)
+    saved = _parse_saved_inputs(row)
+    return _post_content_hash(row.get("content") or "", saved.get("Game_version") or "", thread_name)
+
+
+class ThreadF95Index:
+    def __init__(self, index_file: Path = THREAD_INDEX_FILE):
+        self.index_file = index_file
+        self._entries: Optional[Dict[str, Dict]] = None
+
+    def _load(self) -> Dict[str, Dict]:
+        if self._entries is None:
+            try:
+                if self.index_file.exists():
+                    content = self.index_file.read_text(encoding='utf-8')
+                    self._entries = json.loads(content) if content.strip() else {}
+                else:
+                    self._entries = {}
+            except Exception as e:
+                logger.warning(f"⚠️ Index thread→F95 illisible, reconstruction: {e}")
+                self._entries = {}
+        return self._entries
+
+    def save(self) -> None:
+        """Écrit l'index sur disque (fichier temporaire puis remplacement atomique)."""
+        try:
+            tmp = self.index_file.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self._load(), ensure_ascii=False, separators=(",", ":")), encoding='utf-8')
+            tmp.replace(self.index_file)
+        except Exception as e:
+            logger.warning(f"⚠️ Échec sauvegarde index thread→F95: {e}")
+
+    def get(self, thread_id) -> Optional[Dict]:
+        return self._load().get(str(thread_id))
+
+    def put(self, thread_id, f95_id: Optional[str], post_version: Optional[str],
+            content_hash: str, updated_at: str = "", save: bool = True) -> None:
+        """Ajoute ou remplace l'entrée d'un thread (f95_id None = thread ignoré par le contrôle)."""
+        self._load()[str(thread_id)] = {
+            "f95_id": f95_id,
+            "post_version": post_version,
+            "content_hash": content_hash,
+            "updated_at": updated_at or "",
+            "last_seen": int(time.time()),
+        }
+        if save:
+            self.save()
+
+    def is_fresh(self, thread_id, content_hash: str) -> bool:
+        """
+        True si l'entrée existe avec la même empreinte. updated_at n'entre pas en compte : le frontend
+        et les MAJ auto le réécrivent sans toucher aux champs extraits. Entrée sans empreinte = à revérifier.
+        """
+        entry = self.get(thread_id)
+        return bool(entry) and bool(entry.get("content_hash")) and entry.get("content_hash") == content_hash
+
+    def remove(self, thread_id, save: bool = True) -> None:
+        if self._load().pop(str(thread_id), None) is not None and save:
+            self.save()
+
+    def prune(self, keep_thread_ids) -> int:
+        """Retire les threads qui n'existent plus dans le forum. Retourne le nombre d'entrées supprimées."""
+        keep = {str(t) for t in keep_thread_ids}
+        entries = self._load()
+        stale = [tid for tid in entries if tid not in keep]
+        for tid in stale:
+            del entries[tid]
+        return len(stale)
+
+
+thread_index = ThreadF95Index()
+
+
+def _index_post(thread_id, row: Dict, thread_name: str, save: bool = True) -> None:
+    """Met à jour l'index thread→F95 depuis une ligne/payload published_posts (publication, MAJ, version auto)."""
+    if not thread_id:
+        return
+    try:
+        game_link, post_version = _post_data_from_row(row, thread_name)
+        f95_id = _f95_id_from_game_link(game_link)
+        thread_index.put(
+            thread_id, f95_id, post_version if f95_id else None,
+            _row_content_hash(row, thread_name), str(row.get("updated_at") or ""), save=save
+        )
+    except Exception as e:
+        logger.warning(f"⚠️ Mise à jour index thread→F95 impossible (thread {thread_id}): {e}")
+
+
+# ==================== CACHE THREADS ARCHIVÉS ====================
+# Liste persistante des threads archivés par forum + watermark (archive_timestamp le plus récent vu).
+# Structure: {forum_id: {"watermark": iso, "full_refresh_at": ts, "threads": {thread_id: payload Discord brut}}}
+FORUM_THREADS_CACHE_FILE = HISTORY_FILE.with_name("forum_threads_cache.json")
+
+
+class ForumThreadCache:
+    def __init__(self, cache_file: Path = FORUM_THREADS_CACHE_FILE):
+        self.cache_file = cache_file
+        self._forums: Optional[Dict[str, Dict]] = None
+
+    def _load(self) -> Dict[str, Dict]:
+        if self._forums is None:
+            try:
+                if self.cache_file.exists():
+                    content = self.cache_file.read_text(encoding='utf-8')
+                    self._forums = json.loads(content) if content.strip() else {}
+                else:
+                    self._forums = {}
+            except Exception as e:
+                logger.warning(f"⚠️ Cache threads archivés illisible, scan complet au prochain passage: {e}")
+                self._forums = {}
+        return self._forums
+
+    def save(self) -> None:
+        try:
+            tmp = self.cache_file.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self._load(), ensure_ascii=False, separators=(",", ":")), encoding='utf-8')
+            tmp.replace(self.cache_file)
+        except Exception as e:
+            logger.warning(f"⚠️ Échec sauvegarde cache threads archivés: {e}")
+
+    def get(self, forum_id) -> Optional[Dict]:
+        """Entrée du forum, ou None si absente ou trop ancienne (scan complet requis)."""
+        entry = self._load().get(str(forum_id))
+        if not entry:
+            return None
+        max_age = config.FORUM_THREAD_CACHE_FULL_REFRESH_HOURS * 3600
+        if max_age and time.time() - (entry.get("full_refresh_at") or 0) > max_age:
+            return None
+        return entry
+
+    def set(self, forum_id, threads: Dict[str, Dict], watermark: Optional[str], full_refresh_at: float) -> None:
+        self._load()[str(forum_id)] = {
+            "watermark": watermark,
+            "full_refresh_at": full_refresh_at,
+            "threads": threads,
+        }
+        self.save()
+
+    def update_thread(self, thread_id, data: Dict) -> None:
+        """Remplace le payload d'un thread déjà en cache (événement gateway)."""
+        for entry in self._load().values():
+            threads = entry.get("threads") or {}
+            if str(thread_id) in threads:
+                threads[str(thread_id)] = data
+                self.save()
+                return
+
+    def discard(self, thread_id) -> None:
+        """Retire un thread supprimé de tous les forums en cache."""
+        changed = False
+        for entry in self._load().values():
+            if (entry.get("threads") or {}).pop(str(thread_id), None) is not None:
+                changed = True
+        if changed:
+            self.save()
+
+
+forum_thread_cache = ForumThreadCache()
+
+# ==================== CACHE TAGS FORUM ====================
+# available_tags par forum sous forme {nom en minuscules: id}, en mémoire avec TTL.
+# Invalidé par on_guild_channel_update ; rempli depuis le cache gateway, sinon GET /channels/{id}.
+class ForumTagCache:
     def __init__(self):
-        self.remaining: Optional[int] = None
-        self.limit: Optional[int] = None
-        self.reset_at: Optional[float] = None
-    
-    def update_from_headers(self, headers: dict):
+        self._forums: Dict[str, Tuple[float, Dict[str, int]]] = {}
+
+    @staticmethod
+    def _index(tags) -> Dict[str, int]:
+        index = {}
+        for t in tags or []:
+            name = t.get("name") if isinstance(t, dict) else getattr(t, "name", None)
+            tag_id = t.get("id") if isinstance(t, dict) else getattr(t, "id", None)
+            if name and tag_id:
+                index.setdefault(name.lower(), int(tag_id))
+        return index
+
+    def get(self, forum_id) -> Optional[Dict[str, int]]:
+        entry = self._forums.get(str(forum_id))
+        if not entry or entry[0] < time.time():
+            return None
+        return entry[1]
+
+    def set(self, forum_id, tags) -> Dict[str, int]:
+        index = self._index(tags)
+        self._forums[str(forum_id)] = (time.time() + config.FORUM_TAG_CACHE_TTL_SECONDS, index)
+        return index
+
+    def invalidate(self, forum_id) -> None:
+        self._forums.pop(str(forum_id), None)
+
+
+forum_tag_cache = ForumTagCache()
+
+# ==================== WATERMARKS NETTOYAGE ====================
+# Dernier last_message_id scanné par le nettoyage nocturne, par thread : {thread_id: last_message_id}.
+# Un thread dont le last_message_id n'a pas bougé est ignoré ; sinon seuls les messages postérieurs sont lus.
+CLEANUP_WATERMARKS_FILE = HISTORY_FILE.with_name("cleanup_watermarks.json")
+
+
+class CleanupWatermarks:
+    def __init__(self, watermarks_file: Path = CLEANUP_WATERMARKS_FILE):
+        self.watermarks_file = watermarks_file
+        self._marks: Optional[Dict[str, str]] = None
+
+    def _load(self) -> Dict[str, str]:
+        if self._marks is None:
+            try:
+                if self.watermarks_file.exists():
+                    content = self.watermarks_file.read_text(encoding='utf-8')
+                    self._marks = json.loads(content) if content.strip() else {}
+                else:
+                    self._marks = {}
+            except Exception as e:
+                logger.warning(f"⚠️ Watermarks nettoyage illisibles, scan complet au prochain passage: {e}")
+                self._marks = {}
+        return self._marks
+
+    def save(self) -> None:
+        try:
+            tmp = self.watermarks_file.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self._load(), separators=(",", ":")), encoding='utf-8')
+            tmp.replace(self.watermarks_file)
+        except Exception as e:
+            logger.warning(f"⚠️ Échec sauvegarde watermarks nettoyage: {e}")
+
+    def get(self, thread_id) -> Optional[str]:
+        return self._load().get(str(thread_id))
+
+    def set(self, thread_id, last_message_id) -> None:
+        self._load()[str(thread_id)] = str(last_message_id)
+
+    def prune(self, keep_ids) -> None:
+        """Oublie les threads qui ne sont plus dans le forum."""
+        keep = {str(t) for t in keep_ids}
+        marks = self._load()
+        for thread_id in [t for t in marks if t not in keep]:
+            del marks[thread_id]
+
+
+cleanup_watermarks = CleanupWatermarks()
+
+# ==================== JOBS DE PUBLICATION ====================
+# Publications asynchrones : le handler répond 202 + job_id, un pool de workers exécute le pipeline.
+# SQLite (WAL) : les jobs en file survivent à un redémarrage.
+# Table: publish_jobs(id PRIMARY KEY, kind, status, step, fields, result, error, created_at, updated_at)
+PUBLISH_JOBS_DB = Path("publish_jobs.db")
+PUBLISH_JOBS_TTL_DAYS = 7
+
+
+class PublishJobQueue:
+    def __init__(self, db_file: Path = PUBLISH_JOBS_DB):
+        self.db_file = db_file
+        self._conn: Optional[sqlite3.Connection] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(str(self.db_file), isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS publish_jobs ("
+                " id TEXT PRIMARY KEY,"
+                " kind TEXT NOT NULL,"
+                " status TEXT NOT NULL,"
+                " step TEXT,"
+                " fields TEXT NOT NULL,"
+                " result TEXT,"
+                " error TEXT,"
+                " created_at REAL NOT NULL,"
+                " updated_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_publish_jobs_status ON publish_jobs (status)")
+            self._conn = conn
+        return self._conn
+
+    def _update(self, job_id: str, **values) -> None:
+        values["updated_at"] = time.time()
+        cols = ", ".join(f"{k} = ?" for k in values)
+        self._db().execute(f"UPDATE publish_jobs SET {cols} WHERE id = ?", (*values.values(), job_id))
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Job sans ses champs d'entrée (contenu potentiellement volumineux)."""
+        row = self._db().execute(
+            "SELECT id, kind, status, step, result, error, created_at, updated_at FROM publish_jobs WHERE id = ?",
+            (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def submit(self, kind: str, fields: Dict[str, str]) -> Dict:
+        """Enregistre le job (status queued) puis le met en file ; les workers démarrent si besoin."""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        self._db().execute(
+            "INSERT INTO publish_jobs (id, kind, status, step, fields, created_at, updated_at) VALUES (?, ?, 'queued', NULL, ?, ?, ?)",
+            (job_id, kind, json.dumps(fields, ensure_ascii=False), now, now)
+        )
+        self._ensure_workers()
+        self._queue.put_nowait(job_id)
+        logger.info(f"📥 Job de publication {job_id} en file ({kind})")
+        return {"id": job_id, "status": "queued"}
+
+    def _ensure_workers(self) -> None:
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        self._workers = [w for w in self._workers if not w.done()]
+        for i in range(len(self._workers), config.PUBLISH_JOB_CONCURRENCY):
+            self._workers.append(asyncio.create_task(self._worker(i + 1)))
+
+    async def start(self) -> None:
+        """
+        Reprise après redémarrage : les jobs 'queued' sont remis en file ; les jobs 'running' interrompus
+        passent en 'failed' (le thread a pu être créé, on ne republie pas à l'aveugle).
+        """
+        try:
+            db = self._db()
+            cutoff = time.time() - PUBLISH_JOBS_TTL_DAYS * 86400
+            db.execute("DELETE FROM publish_jobs WHERE status IN ('done', 'failed') AND updated_at < ?", (cutoff,))
+            db.execute(
+                "UPDATE publish_jobs SET status = 'failed', error = ?, updated_at = ? WHERE status = 'running'",
+                ("Interrompu par un redémarrage du serveur", time.time())
+            )
+            pending = [r["id"] for r in db.execute("SELECT id FROM publish_jobs WHERE status = 'queued' ORDER BY created_at")]
+        except Exception as e:
+            logger.warning(f"⚠️ Reprise des jobs de publication impossible: {e}")
+            return
+        self._ensure_workers()
+        for job_id in pending:
+            self._queue.put_nowait(job_id)
+        if pending:
+            logger.info(f"🔁 {len(pending)} job(s) de publication repris après redémarrage")
+
+    async def close(self) -> None:
+        for w in self._workers:
+            w.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _worker(self, worker_id: int):
+        runners = {"forum_post": _run_forum_post}
+        while True:
+            job_id = await self._queue.get()
+            try:
+                row = self._db().execute("SELECT kind, fields FROM publish_jobs WHERE id = ? AND status = 'queued'", (job_id,)).fetchone()
+                if row is None:
+                    continue
+                self._update(job_id, status="running")
+                logger.info(f"👷 Worker jobs {worker_id}: job {job_id} ({row['kind']})")
+                ok, result = await runners[row["kind"]](
+                    json.loads(row["fields"]), progress=lambda name: self._update(job_id, step=name)
+                )
+                if ok:
+                    self._update(job_id, status="done", step=None, result=json.dumps(result, ensure_ascii=False))
+                else:
+                    self._update(job_id, status="failed", result=json.dumps(result, ensure_ascii=False, default=str),
+                                 error="Échec de la publication Discord")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Job de publication {job_id} en échec: {e}")
+                try:
+                    self._update(job_id, status="failed", error=f"{type(e).__name__}: {e}")
+                except Exception:
+                    pass
+            finally:
+                self._queue.task_done()
+
+
+publish_jobs = PublishJobQueue()
+
+# ==================== OUTBOX DES ANNONCES ====================
+# Les annonces (publication, MAJ, suppression) sont mises en file au lieu d'être envoyées dans la requête HTTP :
+# le handler répond dès que le thread est écrit, un worker les livre dans l'ordre sous le rate limiter Discord
+# et relance les échecs avec un délai exponentiel. SQLite (WAL) : les annonces en attente survivent à un redémarrage.
+# Table: announcement_outbox(id, kind, thread_id, title, channel_id, payload, status, attempts,
+#        next_attempt_at, last_error, message_id, created_at, updated_at)
+ANNOUNCEMENT_OUTBOX_DB = Path("announcement_outbox.db")
+ANNOUNCEMENT_OUTBOX_TTL_DAYS = 7
+ANNOUNCEMENT_BACKOFF_BASE_SECONDS = 5
+ANNOUNCEMENT_BACKOFF_MAX_SECONDS = 900
+# Erreurs définitives : inutile de relancer (payload refusé, salon inaccessible ou supprimé)
+ANNOUNCEMENT_PERMANENT_STATUSES = (400, 401, 403, 404)
+
+
+class AnnouncementOutbox:
+    def __init__(self, db_file: Path = ANNOUNCEMENT_OUTBOX_DB):
+        self.db_file = db_file
+        self._conn: Optional[sqlite3.Connection] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._worker_task: Optional[asyncio.Task] = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(str(self.db_file), isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS announcement_outbox ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " kind TEXT NOT NULL,"
+                " thread_id TEXT,"
+                " title TEXT,"
+                " channel_id TEXT NOT NULL,"
+                " payload TEXT NOT NULL,"
+                " status TEXT NOT NULL,"
+                " attempts INTEGER NOT NULL DEFAULT 0,"
+                " next_attempt_at REAL NOT NULL,"
+                " last_error TEXT,"
+                " message_id TEXT,"
+                " created_at REAL NOT NULL,"
+                " updated_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_announcement_outbox_due ON announcement_outbox (status, next_attempt_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_announcement_outbox_thread ON announcement_outbox (thread_id)")
+            self._conn = conn
+        return self._conn
+
+    def _update(self, announcement_id: int, **values) -> None:
+        values["updated_at"] = time.time()
+        cols = ", ".join(f"{k} = ?" for k in values)
+        self._db().execute(f"UPDATE announcement_outbox SET {cols} WHERE id = ?", (*values.values(), announcement_id))
+
+    def enqueue(self, kind: str, payload: Dict, thread_id=None, title: str = "") -> Optional[Dict]:
+        """Enregistre l'annonce (status pending) et réveille le worker. None si aucun salon d'annonce."""
+        if not config.PUBLISHER_ANNOUNCE_CHANNEL_ID:
+            logger.warning("⚠️ PUBLISHER_ANNOUNCE_CHANNEL_ID non configuré, annonce non envoyée")
+            return None
+        now = time.time()
+        try:
+            cur = self._db().execute(
+                "INSERT INTO announcement_outbox (kind, thread_id, title, channel_id, payload, status, attempts,"
+                " next_attempt_at, created_at, updated_at) VALUES (?, ?, ?, ?, ?, 'pending', 0, ?, ?, ?)",
+                (kind, str(thread_id) if thread_id else None, title, str(config.PUBLISHER_ANNOUNCE_CHANNEL_ID),
+                 json.dumps(payload, ensure_ascii=False), now, now, now)
+            )
+        except Exception as e:
+            logger.error(f"❌ Mise en file de l'annonce impossible ({title}): {e}")
+            return None
+        self._ensure_worker()
+        self._wakeup.set()
+        logger.info(f"📥 Annonce {cur.lastrowid} en file ({kind}): {title}")
+        return {"id": cur.lastrowid, "status": "pending"}
+
+    def status_by_thread(self) -> Dict[str, Dict]:
+        """État de livraison de la dernière annonce de chaque thread (affiché dans l'historique)."""
+        rows = self._db().execute(
+            "SELECT id, kind, thread_id, status, attempts, last_error, message_id, updated_at FROM announcement_outbox"
+            " WHERE thread_id IS NOT NULL ORDER BY id"
+        ).fetchall()
+        return {r["thread_id"]: {k: r[k] for k in r.keys() if k != "thread_id"} for r in rows}
+
+    def get_info(self) -> Dict[str, int]:
+        rows = self._db().execute("SELECT status, COUNT(*) AS n FROM announcement_outbox GROUP BY status").fetchall()
+        return {r["status"]: r["n"] for r in rows}
+
+    def _ensure_worker(self) -> None:
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        if self._worker_task is None or self._worker_task.done():
+            self._worker_task = asyncio.create_task(self._worker())
+
+    async def start(self) -> None:
+        """Purge les annonces terminées anciennes puis relance la livraison des annonces en attente."""
+        try:
+            cutoff = time.time() - ANNOUNCEMENT_OUTBOX_TTL_DAYS * 86400
+            self._db().execute("DELETE FROM announcement_outbox WHERE status IN ('sent', 'failed') AND updated_at < ?", (cutoff,))
+            pending = self.get_info().get("pending", 0)
+        except Exception as e:
+            logger.warning(f"⚠️ Reprise des annonces en attente impossible: {e}")
+            return
+        self._ensure_worker()
+        if pending:
+            logger.info(f"🔁 {pending} annonce(s) en attente reprise(s) après redémarrage")
+
+    async def close(self) -> None:
+        if self._worker_task:
+            self._worker_task.cancel()
+            await asyncio.gather(self._worker_task, return_exceptions=True)
+            self._worker_task = None
+
+    async def _worker(self):
+        while True:
+            try:
+                row = self._db().execute(
+                    "SELECT * FROM announcement_outbox WHERE status = 'pending' ORDER BY next_attempt_at, id LIMIT 1"
+                ).fetchone()
+            except Exception as e:
+                logger.error(f"❌ Lecture de l'outbox des annonces impossible: {e}")
+                row = None
+            wait = 60.0 if row is None else row["next_attempt_at"] - time.time()
+            if wait > 0:
+                # Réveil anticipé par enqueue() (nouvelle annonce éventuellement due avant)
+                self._wakeup.clear()
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+                continue
+            try:
+                await self._deliver(row)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Livraison de l'annonce {row['id']} en échec: {e}")
+                self._schedule_retry(row, 0, f"{type(e).__name__}: {e}")
+
+    async def _deliver(self, row) -> None:
+        status, data, _ = await _discord_post_json(
+            http_sessions.get("discord"), f"/channels/{row['channel_id']}/messages", json.loads(row["payload"])
+        )
+        if status < 300:
+            message_id = str(data.get("id")) if isinstance(data, dict) and data.get("id") else None
+            self._update(row["id"], status="sent", attempts=row["attempts"] + 1, last_error=None, message_id=message_id)
+            logger.info(f"✅ Annonce envoyée ({row['kind']}): {row['title']}")
+            return
+        self._schedule_retry(row, status, json.dumps(data, ensure_ascii=False, default=str)[:500])
+
+    def _schedule_retry(self, row, status: int, error: str) -> None:
+        attempts = row["attempts"] + 1
+        if status in ANNOUNCEMENT_PERMANENT_STATUSES or attempts >= config.ANNOUNCEMENT_MAX_ATTEMPTS:
+            self._update(row["id"], status="failed", attempts=attempts, last_error=f"{status}: {error}")
+            logger.error(f"❌ Annonce abandonnée après {attempts} essai(s) (status={status}): {row['title']}")
+            return
+        delay = min(ANNOUNCEMENT_BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), ANNOUNCEMENT_BACKOFF_MAX_SECONDS)
+        self._update(row["id"], attempts=attempts, last_error=f"{status}: {error}", next_attempt_at=time.time() + delay)
+        logger.warning(f"⚠️ Échec envoi annonce (status={status}), nouvel essai dans {delay}s: {row['title']}")
+
+
+announcement_outbox = AnnouncementOutbox()
+
+# ==================== IDEMPOTENCE ====================
+# Idempotency-Key (en-tête ou champ multipart idempotency_key) pour /api/forum-post et /api/forum-post/update :
+# une relance du frontend (timeout) rejoue la réponse enregistrée au lieu de republier ; les doublons
+# simultanés attendent la requête en vol. SQLite : les réponses survivent à un redémarrage.
+IDEMPOTENCY_DB = Path("idempotency_keys.db")
+
+
+class IdempotencyStore:
+    def __init__(self, db_file: Path = IDEMPOTENCY_DB):
+        self.db_file = db_file
+        self._conn: Optional[sqlite3.Connection] = None
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(str(self.db_file), isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS idempotency_keys ("
+                " key TEXT PRIMARY KEY,"
+                " status INTEGER NOT NULL,"
+                " body TEXT NOT NULL,"
+                " created_at REAL NOT NULL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def _lookup(self, key: str) -> Optional[Tuple[int, Dict]]:
+        cutoff = time.time() - config.IDEMPOTENCY_TTL_HOURS * 3600
+        row = self._db().execute(
+            "SELECT status, body FROM idempotency_keys WHERE key = ? AND created_at >= ?", (key, cutoff)
+        ).fetchone()
+        return (row[0], json.loads(row[1])) if row else None
+
+    def _store(self, key: str, status: int, body: Dict) -> None:
+        db = self._db()
+        db.execute(
+            "INSERT OR REPLACE INTO idempotency_keys (key, status, body, created_at) VALUES (?, ?, ?, ?)",
+            (key, status, json.dumps(body, ensure_ascii=False, default=str), time.time())
+        )
+        db.execute("DELETE FROM idempotency_keys WHERE created_at < ?", (time.time() - config.IDEMPOTENCY_TTL_HOURS * 3600,))
+
+    async def run(self, scope: str, key: Optional[str], factory) -> Tuple[int, Dict, bool]:
+        """
+        Exécute factory() (coroutine -> (status, body)) au plus une fois par (scope, key).
+        Seules les réponses 2xx sont conservées : un échec peut être relancé avec la même clé.
+        Returns:
+            (status, body, rejouée)
+        """
+        if not key:
+            status, body = await factory()
+            return status, body, False
+        full_key = f"{scope}:{key}"
+        try:
+            cached = self._lookup(full_key)
+        except Exception as e:
+            logger.warning(f"⚠️ Lecture idempotence impossible ({full_key}): {e}")
+            cached = None
+        if cached:
+            logger.info(f"♻️ Requête rejouée (Idempotency-Key {key})")
+            return cached[0], cached[1], True
+
+        task = self._inflight.get(full_key)
+        replayed = task is not None
+        if task is None:
+            # Tâche détachée : un client qui abandonne (timeout) n'annule pas la publication en cours
+            task = asyncio.ensure_future(factory())
+            self._inflight[full_key] = task
+            task.add_done_callback(lambda _t: self._on_done(full_key, _t))
+        else:
+            logger.info(f"⏳ Doublon simultané rattaché à la requête en cours (Idempotency-Key {key})")
+        status, body = await asyncio.shield(task)
+        return status, body, replayed
+
+    def _on_done(self, full_key: str, task: asyncio.Task) -> None:
+        self._inflight.pop(full_key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        status, body = task.result()
+        if 200 <= status < 300:
+            try:
+                self._store(full_key, status, body)
+            except Exception as e:
+                logger.warning(f"⚠️ Écriture idempotence impossible ({full_key}): {e}")
+
+
+idempotency_store = IdempotencyStore()
+
+
+def _idempotency_key(request, fields: Dict[str, str]) -> Optional[str]:
+    return (request.headers.get("Idempotency-Key") or fields.get("idempotency_key") or "").strip() or None
+
+
+def _idempotent_response(request, status: int, body: Dict, replayed: bool):
+    resp = web.json_response(body, status=status)
+    if replayed:
+        resp.headers["Idempotent-Replayed"] = "true"
+    return _with_cors(request, resp)
+
+# ==================== CACHE IMAGES ====================
+# Images de couverture téléchargées pour les pièces jointes : fichiers adressés par contenu (sha256) dans
+# image_cache/, index SQLite par URL (ETag/Last-Modified, fraîcheur, dernier usage). Une entrée fraîche est
+# servie sans requête ; une entrée périmée est revalidée (304 = pas de re-téléchargement). Taille plafonnée,
+# éviction LRU ; plusieurs URLs d'un même contenu partagent le fichier. Les octets stockés sont ceux envoyés à
+# Discord (après normalisation) ; `variant` identifie les réglages de normalisation utilisés.
+# Table: image_cache(url PRIMARY KEY, sha256, filename, content_type, size, etag, last_modified, fresh_until, last_used, variant)
+IMAGE_CACHE_DIR = Path("image_cache")
+
+
+class ImageCache:
+    def __init__(self, cache_dir: Path = IMAGE_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.cache_dir / "index.db"), isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS image_cache ("
+                " url TEXT PRIMARY KEY,"
+                " sha256 TEXT NOT NULL,"
+                " filename TEXT NOT NULL,"
+                " content_type TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " etag TEXT,"
+                " last_modified TEXT,"
+                " fresh_until REAL NOT NULL,"
+                " last_used REAL NOT NULL,"
+                " variant TEXT NOT NULL DEFAULT '')"
+            )
+            # Cache créé avant l'ajout de la colonne variant
+            if "variant" not in {r[1] for r in conn.execute("PRAGMA table_info(image_cache)")}:
+                conn.execute("ALTER TABLE image_cache ADD COLUMN variant TEXT NOT NULL DEFAULT ''")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_image_cache_last_used ON image_cache (last_used)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_image_cache_sha256 ON image_cache (sha256)")
+            self._conn = conn
+        return self._conn
+
+    def _blob_path(self, sha256: str) -> Path:
+        return self.cache_dir / sha256[:2] / sha256
+
+    def lookup(self, url: str, variant: str = "") -> Optional[Dict]:
+        """
+        Entrée de l'URL si son fichier est présent (entrée orpheline supprimée sinon)
+        et produite avec les mêmes réglages de normalisation.
+        """
+        row = self._db().execute("SELECT * FROM image_cache WHERE url = ?", (url,)).fetchone()
+        if row is None or row["variant"] != variant:
+            return None
+        if not self._blob_path(row["sha256"]).exists():
+            self._db().execute("DELETE FROM image_cache WHERE url = ?", (url,))
+            return None
+        return dict(row)
+
+    def read(self, entry: Dict, fresh_until: Optional[float] = None) -> Optional[Tuple[bytes, str, str]]:
+        """Contenu d'une entrée (dernier usage mis à jour ; fraîcheur prolongée après un 304)."""
+        try:
+            data = self._blob_path(entry["sha256"]).read_bytes()
+        except OSError:
+            return None
+        if fresh_until is None:
+            self._db().execute("UPDATE image_cache SET last_used = ? WHERE url = ?", (time.time(), entry["url"]))
+        else:
+            self._db().execute(
+                "UPDATE image_cache SET last_used = ?, fresh_until = ? WHERE url = ?", (time.time(), fresh_until, entry["url"])
+            )
+        return data, entry["filename"], entry["content_type"]
+
+    def store(self, url: str, data: bytes, filename: str, content_type: str,
+              etag: Optional[str], last_modified: Optional[str], fresh_until: float, variant: str = "") -> None:
+        sha256 = hashlib.sha256(data).hexdigest()
+        blob = self._blob_path(sha256)
+        if not blob.exists():
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            tmp = blob.with_suffix(".tmp")
+            tmp.write_bytes(data)
+            tmp.replace(blob)
+        self._db().execute(
+            "INSERT OR REPLACE INTO image_cache (url, sha256, filename, content_type, size, etag, last_modified, fresh_until, last_used, variant)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (url, sha256, filename, content_type, len(data), etag, last_modified, fresh_until, time.time(), variant)
+        )
+        self._evict()
+
+    def _evict(self) -> None:
+        """Supprime les URLs les moins récemment utilisées tant que le cache dépasse IMAGE_CACHE_MAX_MB."""
+        db = self._db()
+        cap = config.IMAGE_CACHE_MAX_MB * 1024 * 1024
+        total = db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM (SELECT MAX(size) AS size FROM image_cache GROUP BY sha256)"
+        ).fetchone()[0]
+        evicted = 0
+        while total > cap:
+            row = db.execute("SELECT url, sha256, size FROM image_cache ORDER BY last_used LIMIT 1").fetchone()
+            if row is None:
+                break
+            db.execute("DELETE FROM image_cache WHERE url = ?", (row["url"],))
+            evicted += 1
+            # Fichier partagé par une autre URL : conservé
+            if db.execute("SELECT 1 FROM image_cache WHERE sha256 = ? LIMIT 1", (row["sha256"],)).fetchone() is None:
+                with contextlib.suppress(OSError):
+                    self._blob_path(row["sha256"]).unlink()
+                total -= row["size"]
+        if evicted:
+            logger.info(f"🧹 Cache images: {evicted} entrée(s) évincée(s) (LRU)")
+
+
+image_cache = ImageCache()
+
+# ==================== NORMALISATION IMAGES ====================
+# Optionnelle (IMAGE_NORMALIZE_ENABLED + Pillow) : réduction / ré-encodage WebP ou JPEG sous un budget d'octets
+# avant upload. Le travail CPU tourne dans un ProcessPoolExecutor (image_normalize.normalize_image), jamais
+# dans l'event loop ; le résultat est mis en cache avec l'image (ImageCache, colonne variant).
+
+
+class ImageNormalizer:
+    def __init__(self):
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._warned = False
+
+    @property
+    def enabled(self) -> bool:
+        if not config.IMAGE_NORMALIZE_ENABLED:
+            return False
+        if not image_normalize.PIL_AVAILABLE:
+            if not self._warned:
+                logger.warning("⚠️ IMAGE_NORMALIZE_ENABLED mais Pillow non installé, images envoyées telles quelles")
+                self._warned = True
+            return False
+        return True
+
+    @property
+    def variant(self) -> str:
+        """Signature des réglages (clé de cache) ; vide si la normalisation est inactive."""
+        if not self.enabled:
+            return ""
+        return f"{config.IMAGE_NORMALIZE_FORMAT}:{config.IMAGE_NORMALIZE_MAX_DIMENSION}:{config.IMAGE_NORMALIZE_MAX_KB}"
+
+    async def normalize(self, data: bytes, filename: str, content_type: str) -> Tuple[bytes, str, str]:
+        """(bytes, filename, content_type) normalisés, ou inchangés si inutile / impossible."""
+        if not self.enabled:
+            return data, filename, content_type
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=config.IMAGE_NORMALIZE_WORKERS)
+        try:
+            result = await asyncio.get_event_loop().run_in_executor(
+                self._pool, image_normalize.normalize_image, data,
+                config.IMAGE_NORMALIZE_MAX_DIMENSION, config.IMAGE_NORMALIZE_MAX_KB * 1024, config.IMAGE_NORMALIZE_FORMAT
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Normalisation image impossible, original conservé: {e}")
+            return data, filename, content_type
+        if result is None:
+            return data, filename, content_type
+        out, ext, out_type = result
+        logger.info(f"🖼️ Image normalisée: {len(data) // 1024} Ko -> {len(out) // 1024} Ko ({out_type})")
+        return out, f"{filename.rsplit('.', 1)[0]}{ext}", out_type
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+image_normalizer = ImageNormalizer()
+
+# ==================== RATE LIMITER DISCORD ====================
+# Buckets Discord : X-RateLimit-Bucket (hash partagé par plusieurs routes) + paramètre majeur (channel id).
+# Les requêtes attendent AVANT d'épuiser un bucket ; plafond global 50 req/s ; 429 relancées via Retry-After.
+_RE_SNOWFLAKE = re.compile(r"\d{15,25}")
+_RE_MAJOR_PARAM = re.compile(r"^/(?:channels|guilds|webhooks)/(\d+)")
+
+
+class DiscordRateLimiter:
+    GLOBAL_LIMIT_PER_SECOND = 50
+    MAX_429_RETRIES = 3
+
+    def __init__(self):
+        self.route_buckets: Dict[str, str] = {}  # "METHOD /route/{id}" -> hash X-RateLimit-Bucket
+        self.buckets: Dict[str, Dict] = {}  # "hash:major" -> {limit, remaining, reset_at}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._global_lock = asyncio.Lock()
+        self._global_window_start = 0.0
+        self._global_count = 0
+        self._global_blocked_until = 0.0  # 429 global
+        self.total_429 = 0
+
+    @staticmethod
+    def route_key(method: str, path: str) -> Tuple[str, str]:
+        """(clé de route sans IDs, paramètre majeur) pour un chemin d'API."""
+        clean = path.split("?")[0]
+        m = _RE_MAJOR_PARAM.match(clean)
+        return f"{method} {_RE_SNOWFLAKE.sub('{id}', clean)}", (m.group(1) if m else "")
+
+    def _bucket_id(self, route: str, major: str) -> str:
+        return f"{self.route_buckets.get(route, route)}:{major}"
+
+    async def acquire(self, method: str, path: str) -> Tuple[str, str]:
+        """Attend qu'une requête puisse partir sans dépasser son bucket ni le plafond global."""
+        route, major = self.route_key(method, path)
+        # Le verrou (par route + paramètre majeur) met les requêtes en file : une seule attend le reset à la fois.
+        # L'état, lui, est partagé par toutes les routes d'un même hash de bucket.
+        lock = self._locks.setdefault(f"{route}:{major}", asyncio.Lock())
+        async with lock:
+            bucket_id = self._bucket_id(route, major)
+            bucket = self.buckets.get(bucket_id)
+            if bucket is None:
+                # Bucket inconnu : une seule requête part, les suivantes attendent ses en-têtes (≤ 1s)
+                self.buckets[bucket_id] = {"limit": None, "remaining": 0, "reset_at": time.time() + 1.0}
+            else:
+                logged = False
+                while bucket["remaining"] is not None and bucket["remaining"] <= 0:
+                    wait = bucket["reset_at"] - time.time()
+                    if wait <= 0:
+                        bucket["remaining"] = bucket.get("limit") or 1
+                        break
+                    if not logged:
+                        logger.info(f"⏳ Bucket Discord {route} ({major or '-'}) épuisé, attente {wait:.2f}s")
+                        logged = True
+                    # Pas courts : une réponse en vol peut mettre à jour le bucket entre-temps
+                    await asyncio.sleep(min(wait, 0.1))
+                    bucket = self.buckets.get(self._bucket_id(route, major), bucket)
+                if bucket["remaining"] is not None:
+                    bucket["remaining"] -= 1
+        await self._acquire_global()
+        return route, major
+
+    async def _acquire_global(self):
+        async with self._global_lock:
+            wait = self._global_blocked_until - time.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            now = time.monotonic()
+            if now - self._global_window_start >= 1.0:
+                self._global_window_start, self._global_count = now, 0
+            if self._global_count >= self.GLOBAL_LIMIT_PER_SECOND:
+                await asyncio.sleep(self._global_window_start + 1.0 - now)
+                self._global_window_start, self._global_count = time.monotonic(), 0
+            self._global_count += 1
+
+    def update(self, route: str, major: str, status: int, headers, body=None) -> float:
+        """
+        Met à jour l'état du bucket depuis les en-têtes de réponse.
+        Returns:
+            Délai à attendre avant de relancer (429), 0 sinon
+        """
         try:
-            if 'X-RateLimit-Remaining' in headers:
-                self.remaining = int(headers['X-RateLimit-Remaining'])
-            if 'X-RateLimit-Limit' in headers:
-                self.limit = int(headers['X-RateLimit-Limit'])
-            if 'X-RateLimit-Reset' in headers:
-                self.reset_at = float(headers['X-RateLimit-Reset'])
-            if self.remaining is not None and self.remaining < 5:
-                logger.warning(f"⚠️  Rate limit proche: {self.remaining} requêtes restantes")
+            bucket_hash = headers.get("X-RateLimit-Bucket")
+            if bucket_hash and self.route_buckets.get(route) != bucket_hash:
+                self.route_buckets[route] = bucket_hash
+                # La clé provisoire (route) cède la place au hash partagé
+                placeholder = self.buckets.pop(f"{route}:{major}", None)
+                if placeholder is not None:
+                    self.buckets.setdefault(f"{bucket_hash}:{major}", placeholder)
+            bucket_id = self._bucket_id(route, major)
+            bucket = self.buckets.setdefault(bucket_id, {"limit": None, "remaining": None, "reset_at": 0.0})
+            if "X-RateLimit-Limit" in headers:
+                bucket["limit"] = int(headers["X-RateLimit-Limit"])
+            if "X-RateLimit-Remaining" in headers:
+                bucket["remaining"] = int(headers["X-RateLimit-Remaining"])
+            if "X-RateLimit-Reset-After" in headers:
+                bucket["reset_at"] = time.time() + float(headers["X-RateLimit-Reset-After"])
+            elif "X-RateLimit-Reset" in headers:
+                bucket["reset_at"] = float(headers["X-RateLimit-Reset"])
+
+            if status != 429:
+                return 0.0
+            self.total_429 += 1
+            retry_after = headers.get("Retry-After")
+            if retry_after is None and isinstance(body, dict):
+                retry_after = body.get("retry_after")
+            retry_after = float(retry_after or 1.0)
+            is_global = headers.get("X-RateLimit-Global", "").lower() == "true" or (isinstance(body, dict) and body.get("global"))
+            if is_global:
+                self._global_blocked_until = time.time() + retry_after
+            else:
+                bucket["remaining"] = 0
+                bucket["reset_at"] = time.time() + retry_after
+            logger.warning(f"⛔ 429 Discord {'(global) ' if is_global else ''}sur {route}, nouvel essai dans {retry_after:.2f}s")
+            return retry_after
         except Exception as e:
             logger.error(f"Erreur headers rate limit: {e}")
-    
+            return 1.0 if status == 429 else 0.0
+
     def get_info(self) -> dict:
-        info = {"remaining": self.remaining, "limit": self.limit, "reset_at": self.reset_at, "reset_in_seconds": None}
-        if self.reset_at:
-            info["reset_in_seconds"] = int(max(0, self.reset_at - time.time()))
-        return info
+        now = time.time()
+        buckets = {}
+        for bucket_id, b in self.buckets.items():
+            # On n'expose que les buckets encore pertinents (reset dans la dernière minute ou à venir)
+            if b.get("reset_at", 0) < now - 60:
+                continue
+            buckets[bucket_id] = {
+                "limit": b.get("limit"),
+                "remaining": b.get("remaining"),
+                "reset_in_seconds": round(max(0.0, b.get("reset_at", 0) - now), 2),
+            }
+        routes = {}
+        for route, bucket_hash in self.route_buckets.items():
+            routes.setdefault(bucket_hash, []).append(route)
+        return {
+            "global": {
+                "limit_per_second": self.GLOBAL_LIMIT_PER_SECOND,
+                "blocked_for_seconds": round(max(0.0, self._global_blocked_until - now), 2),
+            },
+            "total_429": self.total_429,
+            "buckets": buckets,
+            "routes": routes,
+        }
+
+rate_limiter = DiscordRateLimiter()
+
+# ==================== SESSIONS HTTP PARTAGÉES ====================
+# Une session aiohttp longue durée par hôte amont : connexions TCP+TLS réutilisées (keep-alive) au lieu
+# d'une poignée de main par requête. Créées au démarrage (main_bots.start), fermées à l'arrêt.
+F95_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+    "Accept": "application/json,*/*",
+}
+
+
+class HttpSessions:
+    # name -> (en-têtes par défaut, connexions max, timeout total par défaut)
+    PROFILES = {
+        "discord": (None, 50, 60),   # discord.com (API REST)
+        "f95": (F95_HEADERS, 10, 60),  # f95zone.to (checker.php)
+        "web": (None, 20, 60),       # hôtes d'images externes
+    }
+
+    def __init__(self):
+        self._sessions: Dict[str, aiohttp.ClientSession] = {}
+
+    def _create(self, name: str) -> aiohttp.ClientSession:
+        headers, limit, timeout = self.PROFILES[name]
+        connector = aiohttp.TCPConnector(
+            limit=limit,
+            limit_per_host=limit,
+            ttl_dns_cache=300,
+            keepalive_timeout=60,
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=timeout),
+        )
+
+    def get(self, name: str) -> aiohttp.ClientSession:
+        """Session partagée pour l'hôte `name` (créée à la demande si absente ou fermée)."""
+        session = self._sessions.get(name)
+        if session is None or session.closed:
+            session = self._create(name)
+            self._sessions[name] = session
+        return session
+
+    async def start(self):
+        for name in self.PROFILES:
+            self.get(name)
+        logger.info(f"✅ Sessions HTTP partagées prêtes ({', '.join(self.PROFILES)})")
+
+    async def close(self):
+        for name, session in list(self._sessions.items()):
+            if not session.closed:
+                await session.close()
+        self._sessions.clear()
+        logger.info("🔌 Sessions HTTP partagées fermées")
+
+    @contextlib.asynccontextmanager
+    async def use(self, name: str):
+        """`async with http_sessions.use("discord") as session:` — la session n'est PAS fermée en sortie."""
+        yield self.get(name)
 
-rate_limiter = RateLimitTracker()
+
+http_sessions = HttpSessions()
 
 # ==================== UTILITAIRES ====================
 def _b64decode_padded(s: str) -> bytes:
@@ -508,68 +1651,110 @@ def _extract_f95_thread_id(url: str) -> Optional[str]:
     match = re.search(pattern, url)
     return match.group(1) if match else None
 
-async def fetch_f95_versions_by_ids(session: aiohttp.ClientSession, thread_ids: list) -> Dict[str, str]:
+async def _fetch_f95_checker_chunk(
+    session: aiohttp.ClientSession, chunk: list, chunk_num: int, total_chunks: int
+) -> Optional[Dict[str, str]]:
+    """
+    Interroge checker.php pour un bloc d'IDs, avec retry + backoff exponentiel.
+    Returns:
+        Dict {thread_id: version} du bloc, ou None si toutes les tentatives ont échoué
+    """
+    ids_str = ",".join(str(tid) for tid in chunk)
+    checker_url = f"https://f95zone.to/sam/checker.php?threads={ids_str}"
+    max_attempts = config.F95_CHECKER_MAX_RETRIES + 1
+
+    for attempt in range(1, max_attempts + 1):
+        retry_after = None
+        try:
+            async with session.get(checker_url, timeout=aiohttp.ClientTimeout(total=30)) as resp:
+                if resp.status == 200:
+                    data = await resp.json()
+                    if data.get("status") == "ok" and "msg" in data:
+                        # PHP renvoie [] (et non {}) quand aucun ID n'est connu
+                        chunk_versions = data["msg"] if isinstance(data["msg"], dict) else {}
+                        logger.info(f"✅ Bloc {chunk_num}/{total_chunks}: {len(chunk_versions)} versions récupérées")
+                        return {str(k): v for k, v in chunk_versions.items()}
+                    reason = "réponse invalide"
+                else:
+                    reason = f"HTTP {resp.status}"
+                    retry_after = resp.headers.get("Retry-After")
+        except Exception as e:
+            reason = f"{type(e).__name__}: {e}"
+
+        if attempt >= max_attempts:
+            logger.warning(f"❌ Bloc {chunk_num}/{total_chunks}: abandon après {attempt} tentative(s) ({reason})")
+            return None
+        try:
+            delay = float(retry_after) if retry_after else 0.0
+        except ValueError:
+            delay = 0.0
+        delay = max(delay, 2 ** (attempt - 1)) + random.random()
+        logger.warning(f"⚠️ Bloc {chunk_num}/{total_chunks}: {reason}, nouvel essai dans {delay:.1f}s ({attempt}/{max_attempts})")
+        await asyncio.sleep(delay)
+    return None
+
+
+async def fetch_f95_versions_by_ids(
+    session: aiohttp.ClientSession, thread_ids: list, mode: Optional[str] = None
+) -> Tuple[Dict[str, str], List[str]]:
     """
     🆕 NOUVELLE MÉTHODE: Récupère les versions depuis l'API F95 checker.php
     Plus fiable et rapide que le parsing HTML !
     
     ⚠️ LIMITE API F95: Maximum 100 IDs par requête
-    Cette fonction découpe automatiquement en blocs de 50 IDs pour la sécurité
+    Deux modes (config.F95_CHECKER_MODE, surchargeable via `mode`) :
+    - "concurrent" : blocs de F95_CHECKER_CHUNK_SIZE IDs (100 par défaut) lancés en parallèle,
+      bornés par un sémaphore de F95_CHECKER_CONCURRENCY requêtes
+    - "sequential" : ancien comportement, blocs de 50 IDs l'un après l'autre avec 1s de pause
+    Dans les deux cas, un bloc en échec est retenté avec backoff (F95_CHECKER_MAX_RETRIES).
     
     Args:
         session: Session aiohttp
         thread_ids: Liste des IDs de threads F95 (ex: ["100", "285451"])
+        mode: "concurrent" ou "sequential" (défaut: config.F95_CHECKER_MODE)
     
     Returns:
-        Dict {thread_id: version}
-        Example: {"100": "v0.68", "285451": "Ch.7"}
+        (versions, unresolved)
+        versions: Dict {thread_id: version}, ex: {"100": "v0.68", "285451": "Ch.7"}
+        unresolved: IDs sans donnée (bloc en échec ou ID absent de la réponse)
     """
     if not thread_ids:
-        return {}
-    
-    # ⚠️ LIMITE API: Maximum 100 IDs, on utilise des chunks de 50 par sécurité
-    CHUNK_SIZE = 50
-    total_ids = len(thread_ids)
-    all_versions = {}
-    
-    logger.info(f"📡 F95 API: Récupération pour {total_ids} threads (par blocs de {CHUNK_SIZE})")
-    
-    # Découper en chunks de 50 IDs
-    for chunk_idx in range(0, total_ids, CHUNK_SIZE):
-        chunk = thread_ids[chunk_idx:chunk_idx + CHUNK_SIZE]
-        chunk_num = (chunk_idx // CHUNK_SIZE) + 1
-        total_chunks = (total_ids + CHUNK_SIZE - 1) // CHUNK_SIZE
-        
-        logger.info(f"📡 Bloc {chunk_num}/{total_chunks}: {len(chunk)} IDs")
-        
-        # Construire l'URL pour ce chunk
-        ids_str = ",".join(str(tid) for tid in chunk)
-        checker_url = f"https://f95zone.to/sam/checker.php?threads={ids_str}"
-        
-        try:
-            async with session.get(checker_url, timeout=aiohttp.ClientTimeout(total=30)) as resp:
-                if resp.status != 200:
-                    logger.warning(f"⚠️ F95 Checker API HTTP {resp.status} pour le bloc {chunk_num}")
-                    continue  # Passer au chunk suivant
-                
-                data = await resp.json()
-                
-                if data.get("status") == "ok" and "msg" in data:
-                    chunk_versions = data["msg"]
-                    logger.info(f"✅ Bloc {chunk_num}: {len(chunk_versions)} versions récupérées")
-                    all_versions.update(chunk_versions)
-                else:
-                    logger.warning(f"⚠️ Bloc {chunk_num}: réponse invalide")
-                    
-        except Exception as e:
-            logger.warning(f"❌ Erreur bloc {chunk_num}: {e}")
-        
-        # Petit délai entre les requêtes pour ne pas surcharger l'API
-        if chunk_idx + CHUNK_SIZE < total_ids:
-            await asyncio.sleep(1)
-    
-    logger.info(f"✅ F95 API: TOTAL {len(all_versions)}/{total_ids} versions récupérées")
-    return all_versions
+        return {}, []
+
+    mode = (mode or config.F95_CHECKER_MODE or "concurrent").lower()
+    sequential = mode == "sequential"
+    chunk_size = 50 if sequential else config.F95_CHECKER_CHUNK_SIZE
+    concurrency = 1 if sequential else config.F95_CHECKER_CONCURRENCY
+
+    ids = [str(tid) for tid in thread_ids]
+    total_ids = len(ids)
+    chunks = [ids[i:i + chunk_size] for i in range(0, total_ids, chunk_size)]
+    total_chunks = len(chunks)
+    all_versions: Dict[str, str] = {}
+
+    logger.info(
+        f"📡 F95 API: Récupération pour {total_ids} threads "
+        f"(mode {mode}, {total_chunks} blocs de {chunk_size}, concurrence {concurrency})"
+    )
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _run_chunk(chunk_idx: int, chunk: list) -> Optional[Dict[str, str]]:
+        async with semaphore:
+            result = await _fetch_f95_checker_chunk(session, chunk, chunk_idx + 1, total_chunks)
+            # Mode séquentiel : petit délai entre les requêtes pour ne pas surcharger l'API
+            if sequential and chunk_idx + 1 < total_chunks:
+                await asyncio.sleep(1)
+            return result
+
+    results = await asyncio.gather(*(_run_chunk(i, c) for i, c in enumerate(chunks)))
+    for chunk_versions in results:
+        if chunk_versions:
+            all_versions.update(chunk_versions)
+
+    unresolved = [tid for tid in ids if tid not in all_versions]
+    logger.info(f"✅ F95 API: TOTAL {len(all_versions)}/{total_ids} versions récupérées ({len(unresolved)} sans donnée)")
+    return all_versions, unresolved
 
 def _normalize_version(version: str) -> str:
     """Normalise une version pour la comparaison (enlève backticks, espaces inutiles)"""
@@ -612,81 +1797,155 @@ async def _fetch_f95_title(session: aiohttp.ClientSession, url: str) -> Optional
     
     return txt or None
 
-async def _collect_all_forum_threads(forum: discord.ForumChannel) -> List[discord.Thread]:
+async def _iter_forum_threads(forum: discord.ForumChannel, use_cache: bool = True) -> AsyncIterator[List[discord.Thread]]:
     """
-    Retourne TOUS les threads d'un forum :
-    - Actifs (forum.threads)
-    - Archivés publics (forum.archived_threads)
+    Génère les threads d'un forum page par page, au fil de la pagination :
+    - Actifs (forum.threads, cache gateway), en une page
+    - Archivés publics, par pages de 100 ; avec le cache (use_cache), seules les pages plus récentes
+      que le watermark du dernier passage sont demandées, puis le reste vient du cache persistant
+    Un thread n'est jamais renvoyé deux fois. Le cache n'est mis à jour qu'en fin d'itération complète.
     """
-    all_threads: Dict[int, discord.Thread] = {}
+    seen: set = set()
 
     # 1) Threads actifs (cache)
-    for t in list(getattr(forum, "threads", []) or []):
-        all_threads[t.id] = t
+    active = [t for t in list(getattr(forum, "threads", []) or []) if t.id not in seen]
+    seen.update(t.id for t in active)
+    if active:
+        yield active
 
     # 2) Threads archivés publics (pagination)
-    if hasattr(forum, "archived_threads"):
-        before = None
-        while True:
-            batch = []
-            try:
-                async for t in forum.archived_threads(limit=100, before=before):
-                    batch.append(t)
-            except TypeError:
-                # Compat si la signature diffère
-                async for t in forum.archived_threads(limit=100):
-                    batch.append(t)
-
-            if not batch:
+    guild = getattr(forum, "guild", None)
+    if not guild:
+        return
+    state = guild._state
+    cached = forum_thread_cache.get(forum.id) if use_cache else None
+    watermark = cached.get("watermark") if cached else None
+    watermark_dt = discord.utils.parse_time(watermark) if watermark else None
+    newest = watermark
+    fetched: Dict[str, Dict] = {}
+    before = None
+    pages = 0
+    while True:
+        data = await state.http.get_public_archived_threads(forum.id, before=before, limit=100)
+        raw_threads = data.get("threads", []) if isinstance(data, dict) else []
+        if not raw_threads:
+            break
+        pages += 1
+
+        page = []
+        reached_watermark = False
+        for raw in raw_threads:
+            archive_ts = (raw.get("thread_metadata") or {}).get("archive_timestamp")
+            # Tri archive_timestamp DESC : tout ce qui suit a déjà été vu au dernier passage
+            if watermark_dt and archive_ts and discord.utils.parse_time(archive_ts) <= watermark_dt:
+                reached_watermark = True
                 break
+            fetched[str(raw["id"])] = raw
+            if archive_ts and (not newest or discord.utils.parse_time(archive_ts) > discord.utils.parse_time(newest)):
+                newest = archive_ts
+            if int(raw["id"]) not in seen:
+                seen.add(int(raw["id"]))
+                page.append(discord.Thread(guild=guild, state=state, data=raw))
+        if page:
+            yield page
+
+        if reached_watermark or not data.get("has_more", False):
+            break
+        before = (raw_threads[-1].get("thread_metadata") or {}).get("archive_timestamp")
+        if before is None:
+            break
+        await asyncio.sleep(0.8)
+
+    # 3) Reste de la liste : threads archivés connus au dernier passage
+    merged = dict(cached.get("threads") or {}) if cached else {}
+    remaining = [raw for tid, raw in merged.items() if int(tid) not in seen and tid not in fetched]
+    for i in range(0, len(remaining), 100):
+        page = [discord.Thread(guild=guild, state=state, data=raw) for raw in remaining[i:i + 100]]
+        seen.update(t.id for t in page)
+        yield page
+
+    merged.update(fetched)
+    forum_thread_cache.set(
+        forum.id, merged, newest,
+        cached.get("full_refresh_at") if cached else time.time()
+    )
+    logger.info(
+        f"🗃️ Threads archivés forum {forum.id}: {pages} page(s) demandée(s), {len(fetched)} nouveau(x), "
+        f"{len(remaining)} depuis le cache ({'incrémental' if cached else 'scan complet'})"
+    )
 
-            for t in batch:
-                all_threads[t.id] = t
 
-            # Pagination
-            before = batch[-1].archive_timestamp or batch[-1].created_at
-            await asyncio.sleep(0.8)
+async def _collect_all_forum_threads(forum: discord.ForumChannel, use_cache: bool = True) -> List[discord.Thread]:
+    """
+    Retourne TOUS les threads d'un forum :
+    - Actifs (forum.threads)
+    - Archivés publics (pages récentes + cache persistant, voir _iter_forum_threads)
+    """
+    all_threads: List[discord.Thread] = []
+    async for page in _iter_forum_threads(forum, use_cache=use_cache):
+        all_threads.extend(page)
+    return all_threads
 
-            if before is None:
-                break
+# ==================== EXTRACTION MÉTADONNÉES/CONTENU ====================
+def _extract_game_link_from_content(content: str) -> Optional[str]:
+    """Extrait le lien du jeu depuis le contenu texte du post (formats markdown, legacy et « Jeu original »)."""
+    content = content or ""
+    m_link_md = _RE_GAME_LINK_MD.search(content)
+    if m_link_md:
+        return m_link_md.group("url").strip()
+    m_link_plain = _RE_GAME_LINK_PLAIN.search(content)
+    if m_link_plain:
+        return m_link_plain.group("url").strip()
+    # Nouveau format : * [Jeu original](<url>) — ligne dédiée, pas les autres liens F95
+    m_jeu = _RE_GAME_LINK_JEU_ORIGINAL.search(content)
+    if m_jeu:
+        return m_jeu.group("url").strip()
+    return None
 
-    return list(all_threads.values())
 
-# ==================== EXTRACTION MÉTADONNÉES/CONTENU ====================
-async def _extract_post_data(thread: discord.Thread) -> Tuple[Optional[str], Optional[str]]:
+def _post_data_from_row(row: Dict, thread_name: str) -> Tuple[Optional[str], Optional[str]]:
+    """(game_link, game_version) depuis une ligne published_posts ; la version du nom du thread est prioritaire."""
+    saved = _parse_saved_inputs(row)
+    game_version = (saved.get("Game_version") or "").strip()
+    # Le nom du thread Discord est mis à jour par forum_post_update ; priorité à cette version (état live)
+    version_from_thread_name = _extract_version_from_thread_name(thread_name or "")
+    if version_from_thread_name:
+        game_version = version_from_thread_name
+    game_version = _normalize_version(game_version) if game_version else None
+    return _extract_game_link_from_content(row.get("content") or ""), game_version
+
+
+def _f95_id_from_game_link(game_link: Optional[str]) -> Optional[str]:
+    """ID F95 d'un lien de jeu, ou None si le thread n'est pas contrôlable (absent, LewdCorner, non-F95Zone)."""
+    if not game_link:
+        return None
+    lower = game_link.lower()
+    if "lewdcorner.com" in lower or "f95zone.to" not in lower:
+        return None
+    return _extract_f95_thread_id(game_link)
+
+async def _extract_post_data(
+    thread: discord.Thread,
+    prefetched_rows: Optional[Dict[str, Optional[Dict]]] = None,
+) -> Tuple[Optional[str], Optional[str]]:
     """
     Extrait (game_link, game_version) depuis un thread Discord.
     Priorité : Supabase (published_posts) > métadonnées embed > parsing texte
+    prefetched_rows : map {thread_id: row} issue de _fetch_posts_by_thread_ids_sync ; si le thread y figure,
+    aucune requête Supabase unitaire n'est faite.
     Returns:
         (game_link, game_version) ou (None, None) si non trouvé
     """
     # 1) Priorité : ligne published_posts par thread_id (source de vérité)
-    loop = asyncio.get_event_loop()
-    row = await loop.run_in_executor(None, _fetch_post_by_thread_id_sync, thread.id)
+    if prefetched_rows is not None and str(thread.id) in prefetched_rows:
+        row = prefetched_rows[str(thread.id)]
+    else:
+        loop = asyncio.get_event_loop()
+        row = await loop.run_in_executor(None, _fetch_post_by_thread_id_sync, thread.id)
     if row:
-        saved = _parse_saved_inputs(row)
-        game_version = (saved.get("Game_version") or "").strip()
-        # Le nom du thread Discord est mis à jour par forum_post_update ; priorité à cette version (état live)
-        version_from_thread_name = _extract_version_from_thread_name(getattr(thread, "name", "") or "")
-        if version_from_thread_name:
-            game_version = _normalize_version(version_from_thread_name)
-            logger.info(f"📌 Version post pour {thread.name}: {game_version} (depuis nom du thread)")
-        elif game_version:
-            game_version = _normalize_version(game_version)
+        game_link, game_version = _post_data_from_row(row, getattr(thread, "name", "") or "")
+        if game_version:
             logger.info(f"📌 Version post pour {thread.name}: {game_version}")
-        content = (row.get("content") or "") or ""
-        game_link = None
-        m_link_md = _RE_GAME_LINK_MD.search(content)
-        m_link_plain = _RE_GAME_LINK_PLAIN.search(content)
-        if m_link_md:
-            game_link = m_link_md.group("url").strip()
-        elif m_link_plain:
-            game_link = m_link_plain.group("url").strip()
-        if not game_link:
-            # Nouveau format : * [Jeu original](<url>) — ligne dédiée, pas les autres liens F95
-            m_jeu = _RE_GAME_LINK_JEU_ORIGINAL.search(content)
-            if m_jeu:
-                game_link = m_jeu.group("url").strip()
         if game_link or game_version:
             logger.info(f"✅ Données post depuis Supabase (thread_id={thread.id})")
             return game_link, game_version
@@ -742,17 +2001,7 @@ async def _extract_post_data(thread: discord.Thread) -> Tuple[Optional[str], Opt
     content = (msg.content if msg else "") or ""
     
     # Extraire game_link (toujours depuis le texte car absent des métadonnées)
-    m_link_md = _RE_GAME_LINK_MD.search(content)
-    m_link_plain = _RE_GAME_LINK_PLAIN.search(content)
-    if m_link_md:
-        game_link = m_link_md.group("url").strip()
-    elif m_link_plain:
-        game_link = m_link_plain.group("url").strip()
-    if not game_link:
-        # Nouveau format : * [Jeu original](<url>) — ligne dédiée, pas les autres liens F95
-        m_jeu = _RE_GAME_LINK_JEU_ORIGINAL.search(content)
-        if m_jeu:
-            game_link = m_jeu.group("url").strip()
+    game_link = _extract_game_link_from_content(content)
     
     # Si game_version n'a pas été trouvée dans les métadonnées, parser le texte
     if not game_version:
@@ -845,7 +2094,7 @@ async def _update_post_version(thread: discord.Thread, new_version: str) -> bool
                     break
 
         # Conserver uniquement les embeds non-métadonnées (image, etc.) sur le message principal.
-        # Les métadonnées vont dans un 2e message séparé (comme à la création) puis SUPPRESS pour le masquer.
+        # Les métadonnées vont dans un 2e message séparé (comme à la création), masqué via SUPPRESS_EMBEDS.
         new_embeds = []
         for embed in msg.embeds:
             footer_text = embed.footer.text if embed.footer else ""
@@ -857,40 +2106,16 @@ async def _update_post_version(thread: discord.Thread, new_version: str) -> bool
         try:
             await msg.edit(content=new_content, embeds=[discord.Embed.from_dict(e) for e in new_embeds])
 
-            # Mettre à jour ou créer le message métadonnées séparé (2e message), puis le masquer (SUPPRESS)
+            # Mettre à jour ou créer le message métadonnées séparé (2e message), masqué dans la même requête.
+            # Même écrivain REST que /api/forum-post/update : id connu (Supabase) PATCHé directement.
+            metadata_message_id = None
             if metadata_b64_new and len(metadata_b64_new) <= 25000:
-                metadata_message = None
-                async for m in thread.history(limit=30):
-                    if m.id == msg.id:
-                        continue
-                    for e in m.embeds:
-                        ft = e.footer.text if e.footer else ""
-                        if ft and ft.startswith("metadata:v1:"):
-                            metadata_message = m
-                            break
-                    if metadata_message:
-                        break
-                if metadata_message:
-                    await metadata_message.edit(
-                        content=" ",
-                        embeds=[discord.Embed.from_dict(_build_metadata_embed(metadata_b64_new))]
-                    )
-                    try:
-                        await metadata_message.edit(suppress=True)
-                    except Exception as e:
-                        logger.warning(f"⚠️ Impossible de masquer l'embed métadonnées: {e}")
-                    logger.info(f"✅ Message métadonnées mis à jour et masqué pour {thread.name}")
-                else:
-                    # Créer un 2e message avec les métadonnées puis le masquer
-                    sent = await thread.send(
-                        content=" ",
-                        embeds=[discord.Embed.from_dict(_build_metadata_embed(metadata_b64_new))]
-                    )
-                    try:
-                        await sent.edit(suppress=True)
-                    except Exception as e:
-                        logger.warning(f"⚠️ Impossible de masquer le nouvel embed métadonnées: {e}")
-                    logger.info(f"✅ Message métadonnées créé et masqué pour {thread.name}")
+                metadata_message_id = await _upsert_metadata_message(
+                    http_sessions.get("discord"), str(thread.id), metadata_b64_new,
+                    known_message_id=(row or {}).get("metadata_message_id")
+                )
+                if metadata_message_id:
+                    logger.info(f"✅ Message métadonnées à jour et masqué pour {thread.name}")
 
             # Mettre à jour le titre du thread Discord : référence entre crochets -> nouvelle version (ex: "Jeu [Ch.5]" -> "Jeu [Ch.6]")
             new_title = _build_thread_title_with_version(thread.name, new_version)
@@ -910,10 +2135,19 @@ async def _update_post_version(thread: discord.Thread, new_version: str) -> bool
                         updates = {
                             "title": new_title,
                             "saved_inputs": saved,
+                            # Base du diff de /api/forum-post/update : texte du message tel que réécrit ci-dessus
+                            "content_hash": _content_hash(new_content),
                             "updated_at": datetime.datetime.now(ZoneInfo("UTC")).isoformat(),
                         }
-                        sb.table("published_posts").update(updates).eq("id", row["id"]).execute()
+                        if metadata_message_id:
+                            updates["metadata_message_id"] = metadata_message_id
+                            updates["metadata_hash"] = _metadata_hash(metadata_b64_new)
+                        # Exécuteur : l'appel Supabase est bloquant (les MAJ tournent en parallèle)
+                        await loop.run_in_executor(
+                            None, lambda: sb.table("published_posts").update(updates).eq("id", row["id"]).execute()
+                        )
                         logger.info(f"✅ published_posts mis à jour sur Supabase pour {thread.name}")
+                        _index_post(thread.id, {**row, **updates}, new_title)
                     except Exception as e:
                         logger.warning(f"⚠️ Échec mise à jour Supabase published_posts: {e}")
             logger.info(f"✅ Post mis à jour pour {thread.name}: {new_version}")
@@ -965,10 +2199,189 @@ async def _group_and_send_alerts(channel: discord.TextChannel, alerts: List[Vers
         await asyncio.sleep(1.5)
 
 # ==================== CONTRÔLE VERSIONS F95 ====================
+class _RateBudget:
+    """Budget de débit partagé : au plus `per_second` acquisitions par seconde (espacement régulier)."""
+    def __init__(self, per_second: float):
+        self.interval = 1.0 / per_second if per_second > 0 else 0.0
+        self._next_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next_at - now
+            self._next_at = max(now, self._next_at) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class VersionUpdatePool:
+    """
+    Pool borné de workers pour _update_post_version : chaque MAJ (édition message, métadonnées,
+    renommage, Supabase) tourne en parallèle des autres, sous un budget de débit Discord commun.
+    submit() renvoie un Future résolu avec la VersionAlert de la MAJ.
+    """
+    def __init__(self, concurrency: int, rate_per_second: float):
+        self.concurrency = max(1, concurrency)
+        self.budget = _RateBudget(rate_per_second)
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._workers: List[asyncio.Task] = []
+        self.processed = 0
+
+    def start(self):
+        self._workers = [asyncio.create_task(self._worker(i + 1)) for i in range(self.concurrency)]
+
+    def submit(self, thread: discord.Thread, new_version: str, post_version: str) -> asyncio.Future:
+        fut = asyncio.get_event_loop().create_future()
+        self._queue.put_nowait((thread, new_version, post_version, fut))
+        return fut
+
+    async def _worker(self, worker_id: int):
+        while True:
+            thread, new_version, post_version, fut = await self._queue.get()
+            try:
+                await self.budget.acquire()
+                logger.info(f"👷 Worker {worker_id}: MAJ {thread.name} -> {new_version}")
+                update_success = await _update_post_version(thread, new_version)
+                _mark_as_notified(thread.id, new_version)
+                self.processed += 1
+                if not fut.done():
+                    fut.set_result(VersionAlert(thread.name, thread.jump_url, new_version, post_version, update_success))
+            except Exception as e:
+                if not fut.done():
+                    fut.set_exception(e)
+            finally:
+                self._queue.task_done()
+
+    async def close(self):
+        """Attend la fin des MAJ en file puis arrête les workers."""
+        await self._queue.join()
+        for w in self._workers:
+            w.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+
+
+async def _iter_version_candidates(
+    forum: discord.ForumChannel, seen_thread_ids: set
+) -> AsyncIterator[Tuple[str, discord.Thread, str]]:
+    """
+    Étape extraction du pipeline : consomme les pages de threads au fil de la pagination,
+    précharge les lignes Supabase page par page et génère (f95_id, thread, post_version).
+    seen_thread_ids est complété avec l'ID de chaque thread rencontré (pour l'élagage de l'index).
+    """
+    loop = asyncio.get_event_loop()
+    reused = 0
+    async for page in _iter_forum_threads(forum):
+        seen_thread_ids.update(t.id for t in page)
+        # Préchargement Supabase en une requête in_() par page (au lieu d'une requête par thread)
+        prefetched_rows = await loop.run_in_executor(
+            None, _fetch_posts_by_thread_ids_sync, [t.id for t in page]
+        )
+        for thread in page:
+            row = prefetched_rows.get(str(thread.id))
+            content_hash = _row_content_hash(row, thread.name)
+            updated_at = str((row or {}).get("updated_at") or "")
+
+            # Index persistant : thread inchangé depuis le dernier passage -> pas de re-extraction
+            if thread_index.is_fresh(thread.id, content_hash):
+                entry = thread_index.get(thread.id)
+                reused += 1
+                if entry.get("f95_id") and entry.get("post_version"):
+                    yield entry["f95_id"], thread, entry["post_version"]
+                continue
+
+            if not row:
+                await asyncio.sleep(0.3)  # Anti-spam Discord (fallback message de départ uniquement)
+
+            game_link, post_version = await _extract_post_data(thread, prefetched_rows)
+            f95_id = None
+            if not game_link or not post_version:
+                logger.info(f"⏭️  Thread ignoré (données manquantes): {thread.name}")
+            elif "lewdcorner.com" in game_link.lower():
+                logger.info(f"⏭️  Thread ignoré (LewdCorner): {thread.name}")
+            elif "f95zone.to" not in game_link.lower():
+                logger.info(f"⏭️  Thread ignoré (non-F95Zone): {thread.name}")
+            else:
+                # Extraire l'ID F95
+                f95_id = _extract_f95_thread_id(game_link)
+                if not f95_id:
+                    logger.warning(f"⚠️ Impossible d'extraire l'ID F95 depuis: {game_link}")
+
+            # Ne pas mémoriser un échec de lecture Discord (thread sans ligne Supabase ni données)
+            if row or game_link or post_version:
+                thread_index.put(thread.id, f95_id, post_version if f95_id else None, content_hash, updated_at, save=False)
+            if not f95_id:
+                continue
+
+            logger.info(f"✅ Thread mappé: {thread.name} → F95 ID {f95_id}")
+            yield f95_id, thread, post_version
+
+    logger.info(f"🗂️ Index thread→F95: {reused} thread(s) inchangé(s) réutilisé(s)")
+
+
+async def _check_version_batch(
+    session: aiohttp.ClientSession,
+    batch: Dict[str, Tuple[discord.Thread, str]],
+    channel_notif: discord.TextChannel,
+    update_pool: "VersionUpdatePool",
+    alert_lock: asyncio.Lock,
+) -> int:
+    """
+    Étape comparaison du pipeline pour un lot d'IDs F95 : requête checker.php, comparaison,
+    mises à jour des posts confiées au pool de workers puis envoi des alertes du lot.
+    Retourne le nombre d'alertes envoyées.
+    """
+    logger.info(f"🌐 Récupération API F95 pour {len(batch)} threads...")
+    f95_versions, unresolved_ids = await fetch_f95_versions_by_ids(session, list(batch.keys()))
+
+    # IDs sans donnée F95 (bloc en échec ou thread inconnu) : ni "à jour" ni "mise à jour"
+    for f95_id in unresolved_ids:
+        if f95_id in batch:
+            logger.warning(f"⚠️ Aucune donnée F95 pour {batch[f95_id][0].name} (F95 ID {f95_id})")
+
+    if not f95_versions:
+        logger.warning("⚠️ Aucune version récupérée depuis l'API F95 pour ce lot")
+        return 0
+
+    pending: List[asyncio.Future] = []
+    for f95_id, api_version in f95_versions.items():
+        if f95_id not in batch:
+            continue
+
+        thread, post_version = batch[f95_id]
+
+        # Normaliser les versions
+        api_version_clean = _normalize_version(api_version)
+        post_version_clean = _normalize_version(post_version)
+
+        if api_version_clean != post_version_clean:
+            if not _is_already_notified(thread.id, api_version_clean):
+                logger.info(f"🔄 Différence: {thread.name}: F95={api_version_clean} vs Post={post_version_clean}")
+                pending.append(update_pool.submit(thread, api_version_clean, post_version_clean))
+        else:
+            logger.info(f"✅ Version OK: {thread.name} ({post_version_clean})")
+
+    # Alertes collectées au fil de l'eau, dans l'ordre de fin des MAJ
+    alerts: List[VersionAlert] = []
+    for fut in asyncio.as_completed(pending):
+        try:
+            alerts.append(await fut)
+        except Exception as e:
+            logger.error(f"❌ Erreur worker MAJ version: {e}")
+
+    async with alert_lock:
+        await _group_and_send_alerts(channel_notif, alerts)
+    return len(alerts)
+
+
 async def run_version_check_once():
     """
     🆕 Contrôle des versions F95 via l'API checker.php (salon my uniquement)
     AMÉLIORATION: Utilise l'API au lieu du parsing HTML pour plus de fiabilité !
+    Pipeline en flux : pagination des threads -> extraction -> lots de F95_CHECKER_CHUNK_SIZE IDs
+    -> checker.php + comparaison, lancés dès qu'un lot est plein (sans attendre la fin de la pagination).
     """
     logger.info("🔎 Démarrage contrôle versions F95 (salon my) - Méthode API")
     channel_notif = bot.get_channel(config.PUBLISHER_MAJ_NOTIFICATION_CHANNEL_ID)
@@ -978,88 +2391,71 @@ async def run_version_check_once():
     if not config.FORUM_MY_ID:
         logger.warning("⚠️ PUBLISHER_FORUM_TRAD_ID non configuré")
         return
-    
+
     _clean_old_notifications()
-    
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-        "Accept": "application/json,*/*",
-    }
-    
-    all_alerts: List[VersionAlert] = []
+
     forum = bot.get_channel(config.FORUM_MY_ID)
     if not forum:
         logger.warning(f"⚠️ Forum {config.FORUM_MY_ID} introuvable")
         return
-    
-    threads = await _collect_all_forum_threads(forum)
-    logger.info(f"🔎 Check version F95: {len(threads)} threads (actifs + archivés)")
-    
-    # 📊 PHASE 1: Collecter tous les IDs F95 depuis les threads Discord
-    thread_mapping = {}  # {f95_id: (thread, post_version)}
-    
-    async with aiohttp.ClientSession(headers=headers) as session:
-        for thread in threads:
-            await asyncio.sleep(0.3)  # Anti-spam Discord
-            
-            game_link, post_version = await _extract_post_data(thread)
-            if not game_link or not post_version:
-                logger.info(f"⏭️  Thread ignoré (données manquantes): {thread.name}")
-                continue
-            
-            if "lewdcorner.com" in game_link.lower():
-                logger.info(f"⏭️  Thread ignoré (LewdCorner): {thread.name}")
-                continue
-            
-            if "f95zone.to" not in game_link.lower():
-                logger.info(f"⏭️  Thread ignoré (non-F95Zone): {thread.name}")
-                continue
-            
-            # Extraire l'ID F95
-            f95_id = _extract_f95_thread_id(game_link)
-            if not f95_id:
-                logger.warning(f"⚠️ Impossible d'extraire l'ID F95 depuis: {game_link}")
-                continue
-            
-            thread_mapping[f95_id] = (thread, post_version)
-            logger.info(f"✅ Thread mappé: {thread.name} → F95 ID {f95_id}")
-        
-        if not thread_mapping:
-            logger.info("✅ Aucun thread avec lien F95 trouvé")
-            return
-        
-        # 🚀 PHASE 2: Récupérer toutes les versions via l'API (1 seule requête !)
-        f95_ids = list(thread_mapping.keys())
-        logger.info(f"🌐 Récupération API F95 pour {len(f95_ids)} threads...")
-        
-        f95_versions = await fetch_f95_versions_by_ids(session, f95_ids)
-        
-        if not f95_versions:
-            logger.warning("⚠️ Aucune version récupérée depuis l'API F95")
-            return
-        
-        # 🎯 PHASE 3: Comparaison des versions
-        for f95_id, api_version in f95_versions.items():
-            if f95_id not in thread_mapping:
-                continue
-            
-            thread, post_version = thread_mapping[f95_id]
-            
-            # Normaliser les versions
-            api_version_clean = _normalize_version(api_version)
-            post_version_clean = _normalize_version(post_version)
-            
-            if api_version_clean != post_version_clean:
-                if not _is_already_notified(thread.id, api_version_clean):
-                    logger.info(f"🔄 Différence: {thread.name}: F95={api_version_clean} vs Post={post_version_clean}")
-                    update_success = await _update_post_version(thread, api_version_clean)
-                    all_alerts.append(VersionAlert(thread.name, thread.jump_url, api_version_clean, post_version_clean, update_success))
-                    _mark_as_notified(thread.id, api_version_clean)
-            else:
-                logger.info(f"✅ Version OK: {thread.name} ({post_version_clean})")
-    
-    await _group_and_send_alerts(channel_notif, all_alerts)
-    logger.info(f"📊 Contrôle terminé : {len(all_alerts)} alertes envoyées")
+
+    seen_thread_ids: set = set()
+    batch_size = config.F95_CHECKER_CHUNK_SIZE
+    batch_semaphore = asyncio.Semaphore(config.F95_CHECKER_CONCURRENCY)
+    alert_lock = asyncio.Lock()
+    batch_tasks: List[asyncio.Task] = []
+    mapped = 0
+    started_at = time.monotonic()
+
+    update_pool = VersionUpdatePool(config.VERSION_UPDATE_CONCURRENCY, config.VERSION_UPDATE_RATE)
+    update_pool.start()
+    logger.info(
+        f"👷 Pool MAJ posts: {update_pool.concurrency} worker(s), "
+        f"budget {config.VERSION_UPDATE_RATE:g} MAJ/s"
+    )
+
+    async with http_sessions.use("f95") as session:
+        async def _run_batch(batch: Dict[str, Tuple[discord.Thread, str]]) -> int:
+            async with batch_semaphore:
+                return await _check_version_batch(session, batch, channel_notif, update_pool, alert_lock)
+
+        batch: Dict[str, Tuple[discord.Thread, str]] = {}
+        try:
+            async for f95_id, thread, post_version in _iter_version_candidates(forum, seen_thread_ids):
+                if f95_id not in batch:
+                    mapped += 1
+                batch[f95_id] = (thread, post_version)
+                # Lot plein : requête checker.php lancée pendant que la pagination continue
+                if len(batch) >= batch_size:
+                    batch_tasks.append(asyncio.create_task(_run_batch(batch)))
+                    batch = {}
+            if batch:
+                batch_tasks.append(asyncio.create_task(_run_batch(batch)))
+        finally:
+            results = await asyncio.gather(*batch_tasks, return_exceptions=True)
+            await update_pool.close()
+
+        # Élagage de l'index : uniquement si la pagination a abouti (sinon on garderait un forum partiel)
+        pruned = thread_index.prune(seen_thread_ids) if seen_thread_ids else 0
+        thread_index.save()
+
+    logger.info(
+        f"🔎 Check version F95: {len(seen_thread_ids)} threads (actifs + archivés), {mapped} avec lien F95, "
+        f"{len(batch_tasks)} lot(s), {pruned} entrée(s) d'index obsolète(s) retirée(s)"
+    )
+    if not mapped:
+        logger.info("✅ Aucun thread avec lien F95 trouvé")
+
+    total_alerts = 0
+    for r in results:
+        if isinstance(r, Exception):
+            logger.error(f"❌ Erreur lot contrôle versions: {r}")
+        else:
+            total_alerts += r
+    logger.info(
+        f"📊 Contrôle terminé : {total_alerts} alertes envoyées, {update_pool.processed} post(s) mis à jour "
+        f"par {update_pool.concurrency} worker(s) en {time.monotonic() - started_at:.1f}s"
+    )
 
 # ==================== NETTOYAGE MESSAGES VIDES ====================
 async def run_cleanup_empty_messages_once():
@@ -1073,17 +2469,67 @@ async def run_cleanup_empty_messages_once():
         logger.warning(f"⚠️ Forum {config.FORUM_MY_ID} introuvable")
         return
     threads = await _collect_all_forum_threads(forum)
-    logger.info(f"🧹 Nettoyage: {len(threads)} threads à traiter")
+    # Threads sans activité depuis le dernier passage (last_message_id inchangé) : rien à scanner
+    to_scan = [
+        t for t in threads
+        if not t.last_message_id or cleanup_watermarks.get(t.id) != str(t.last_message_id)
+    ]
+    logger.info(f"🧹 Nettoyage: {len(to_scan)}/{len(threads)} threads avec activité à traiter")
     total_deleted = 0
-    async with aiohttp.ClientSession() as session:
-        for thread_idx, thread in enumerate(threads, 1):
-            await asyncio.sleep(1.0 + random.random())
-            n = await _clean_empty_messages_in_thread(session, str(thread.id))
-            total_deleted += n
+    async with http_sessions.use("discord") as session:
+        # Cadence dictée par les buckets Discord (rate_limiter), plus de délai fixe entre threads
+        for thread_idx, thread in enumerate(to_scan, 1):
+            n = await _clean_empty_messages_in_thread(session, str(thread.id), after_message_id=cleanup_watermarks.get(thread.id))
+            # Échec de lecture : watermark inchangé, le thread sera rescanné au prochain passage
+            if n is not None:
+                total_deleted += n
+                if thread.last_message_id:
+                    cleanup_watermarks.set(thread.id, thread.last_message_id)
             if thread_idx % 10 == 0:
-                logger.info(f"📊 Progression: {thread_idx}/{len(threads)} threads traités")
+                logger.info(f"📊 Progression: {thread_idx}/{len(to_scan)} threads traités")
+                cleanup_watermarks.save()
+    cleanup_watermarks.prune(t.id for t in threads)
+    cleanup_watermarks.save()
     logger.info(f"✅ Nettoyage terminé : {total_deleted} message(s) vide(s) supprimé(s)")
 
+class RealtimeCleanupQueue:
+    """
+    Suppression en arrière-plan des messages repérés par on_message : un seul worker,
+    regroupement par thread sur une courte fenêtre (bulk-delete), cadence via rate_limiter.
+    """
+    BATCH_WINDOW_SECONDS = 2.0
+
+    def __init__(self):
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
+        self.deleted = 0
+
+    def enqueue(self, channel_id, message_id) -> None:
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+        self._queue.put_nowait((str(channel_id), str(message_id)))
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            await asyncio.sleep(self.BATCH_WINDOW_SECONDS)
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            by_channel: Dict[str, List[str]] = {}
+            for channel_id, message_id in batch:
+                by_channel.setdefault(channel_id, []).append(message_id)
+            for channel_id, message_ids in by_channel.items():
+                try:
+                    n = await _discord_bulk_delete_messages(http_sessions.get("discord"), channel_id, message_ids)
+                    self.deleted += n
+                    if n:
+                        logger.info(f"🗑️ Nettoyage temps réel: {n} message(s) supprimé(s) (thread {channel_id})")
+                except Exception as e:
+                    logger.warning(f"⚠️ Exception nettoyage temps réel (thread {channel_id}): {e}")
+
+
+realtime_cleanup = RealtimeCleanupQueue()
+
 # ==================== TÂCHE QUOTIDIENNE ====================
 @tasks.loop(time=datetime.time(hour=config.VERSION_CHECK_HOUR, minute=config.VERSION_CHECK_MINUTE, tzinfo=ZoneInfo("Europe/Paris")))
 async def daily_version_check():
@@ -1406,6 +2852,44 @@ async def on_ready():
         daily_cleanup_empty_messages.start()
         logger.info(f"✅ Nettoyage messages vides programmé à {config.CLEANUP_EMPTY_MESSAGES_HOUR:02d}:{config.CLEANUP_EMPTY_MESSAGES_MINUTE:02d} Europe/Paris")
 
+@bot.event
+async def on_raw_thread_update(payload: discord.RawThreadUpdateEvent):
+    """Garde le cache des threads archivés aligné (renommage, tags, archivage...)."""
+    if payload.parent_id == config.FORUM_MY_ID and payload.data:
+        forum_thread_cache.update_thread(payload.thread_id, payload.data)
+
+@bot.event
+async def on_raw_thread_delete(payload: discord.RawThreadDeleteEvent):
+    """Retire un thread supprimé (depuis Discord ou l'API) du cache des threads archivés."""
+    forum_thread_cache.discard(payload.thread_id)
+
+@bot.listen("on_message")
+async def realtime_cleanup_on_message(message: discord.Message):
+    """Nettoyage temps réel (REALTIME_CLEANUP_ENABLED) : messages vides / « titre changé » des threads du forum."""
+    if not config.REALTIME_CLEANUP_ENABLED or not bot.intents.message_content:
+        # Sans l'intent message_content, tout message paraîtrait vide
+        return
+    channel = message.channel
+    if not isinstance(channel, discord.Thread) or channel.parent_id != config.FORUM_MY_ID:
+        return
+    if message.id == channel.id:
+        # Message de départ du post
+        return
+    msg_dict = {
+        "content": message.content,
+        "attachments": [a.id for a in message.attachments],
+        "embeds": [e.to_dict() for e in message.embeds],
+        "type": message.type.value,
+    }
+    if _is_message_empty_and_not_metadata(msg_dict) or _is_message_thread_name_change(msg_dict):
+        realtime_cleanup.enqueue(channel.id, message.id)
+
+@bot.event
+async def on_guild_channel_update(before: discord.abc.GuildChannel, after: discord.abc.GuildChannel):
+    """Tags du forum modifiés côté Discord : le prochain post relira available_tags."""
+    if isinstance(after, discord.ForumChannel):
+        forum_tag_cache.invalidate(after.id)
+
 # ==================== HELPERS API REST ====================
 def _build_metadata_embed(metadata_b64: str) -> dict:
     """
@@ -1427,19 +2911,39 @@ def _build_metadata_embed(metadata_b64: str) -> dict:
         ]
     }
 
+# Flag de message Discord : embeds masqués (seul flag modifiable via PATCH, envoyé dès la création)
+MESSAGE_FLAG_SUPPRESS_EMBEDS = 1 << 2
+
+def _build_metadata_message_payload(metadata_b64: str) -> dict:
+    """Payload complet du message de métadonnées, déjà masqué (POST ou PATCH en une seule requête)."""
+    return {
+        "content": " ",
+        "embeds": [_build_metadata_embed(metadata_b64)],
+        "flags": MESSAGE_FLAG_SUPPRESS_EMBEDS,
+    }
+
 def _auth_headers():
     return {"Authorization": f"Bot {config.PUBLISHER_DISCORD_TOKEN}"}
 
 async def _discord_request(session, method, path, headers=None, json_data=None, data=None):
+    """
+    Requête REST Discord sous le rate limiter par bucket ; les 429 sont relancées après Retry-After.
+    `data` peut être un callable renvoyant un FormData neuf (un FormData ne se renvoie qu'une fois).
+    """
     url = f"{config.DISCORD_API_BASE}{path}"
     try:
-        async with session.request(method, url, headers=headers, json=json_data, data=data) as resp:
-            rate_limiter.update_from_headers(resp.headers)
-            try:
-                data = await resp.json()
-            except:
-                data = await resp.text()
-            return resp.status, data, resp.headers
+        for attempt in range(DiscordRateLimiter.MAX_429_RETRIES + 1):
+            route, major = await rate_limiter.acquire(method, path)
+            body = data() if callable(data) else data
+            async with session.request(method, url, headers=headers, json=json_data, data=body) as resp:
+                try:
+                    resp_data = await resp.json()
+                except:
+                    resp_data = await resp.text()
+                rate_limiter.update(route, major, resp.status, resp.headers, resp_data)
+                if resp.status != 429 or attempt >= DiscordRateLimiter.MAX_429_RETRIES:
+                    return resp.status, resp_data, resp.headers
+            # 429 : le bucket (ou la pause globale) porte désormais Retry-After, acquire() attendra
     except Exception as e:
         logger.error(f"Erreur requête Discord: {e}")
         return 500, {"error": str(e)}, {}
@@ -1448,15 +2952,22 @@ async def _discord_get(session, path):
     status, data, _ = await _discord_request(session, "GET", path, headers=_auth_headers())
     return status, data
 
-async def _discord_list_messages(session, channel_id: str, limit: int = 50):
-    """Liste les derniers messages d'un channel/thread (REST)."""
+async def _discord_list_messages(session, channel_id: str, limit: int = 50, after: Optional[str] = None, strict: bool = False):
+    """
+    Liste les derniers messages d'un channel/thread (REST), ou ceux postérieurs à `after`.
+    Erreur HTTP : [] par défaut, None si `strict` (l'appelant doit distinguer « aucun message » d'un échec).
+    """
+    query = f"limit={limit}" + (f"&after={after}" if after else "")
     status, data, _ = await _discord_request(
         session,
         "GET",
-        f"/channels/{channel_id}/messages?limit={limit}",
+        f"/channels/{channel_id}/messages?{query}",
         headers=_auth_headers()
     )
     if status >= 300 or not isinstance(data, list):
+        if strict:
+            logger.warning(f"⚠️ Échec lecture messages (channel {channel_id}, status={status})")
+            return None
         return []
     return data
 
@@ -1476,40 +2987,98 @@ async def _discord_patch_form(session, path, form):
 async def _discord_post_form(session, path, form):
     return await _discord_request(session, "POST", path, headers=_auth_headers(), data=form)
 
+def _image_filename(url: str, headers) -> str:
+    """Nom de fichier de la pièce jointe : depuis Content-Disposition ou extrait de l'URL."""
+    disp = headers.get("Content-Disposition")
+    filename = "image.png"
+    if disp and "filename=" in disp:
+        part = disp.split("filename=")[-1].strip().strip('"\'')
+        if part:
+            filename = part
+    else:
+        path = url.split("?")[0].strip("/")
+        if "/" in path:
+            name = path.split("/")[-1]
+            if "." in name and len(name) < 200:
+                filename = name
+    if not any(filename.lower().endswith(ext) for ext in (".png", ".jpg", ".jpeg", ".gif", ".webp")):
+        filename = filename + ".png" if "." not in filename else "image.png"
+    return filename
+
+def _image_fresh_until(headers) -> float:
+    """Fin de fraîcheur d'une image : Cache-Control max-age, sinon IMAGE_CACHE_FRESH_SECONDS."""
+    cache_control = (headers.get("Cache-Control") or "").lower()
+    if "no-cache" in cache_control or "no-store" in cache_control:
+        return time.time()
+    m = re.search(r"max-age=(\d+)", cache_control)
+    return time.time() + (int(m.group(1)) if m else config.IMAGE_CACHE_FRESH_SECONDS)
+
 async def _fetch_image_from_url(session, url: str) -> Optional[Tuple[bytes, str, str]]:
     """
-    Télécharge une image depuis une URL. Retourne (bytes, filename, content_type) ou None en cas d'échec.
+    Télécharge une image depuis une URL, via le cache disque (image_cache) : entrée fraîche servie sans requête,
+    entrée périmée revalidée (If-None-Match / If-Modified-Since), copie périmée servie si l'hôte échoue.
+    Une image téléchargée passe par image_normalizer avant mise en cache.
+    Retourne (bytes, filename, content_type) ou None en cas d'échec.
     """
+    entry = None
+    variant = image_normalizer.variant
+    if config.IMAGE_CACHE_ENABLED:
+        try:
+            entry = image_cache.lookup(url, variant)
+            if entry and entry["fresh_until"] > time.time():
+                cached = image_cache.read(entry)
+                if cached:
+                    logger.info(f"🗃️ Image servie depuis le cache: {url[:60]}...")
+                    return cached
+        except Exception as e:
+            logger.warning(f"⚠️ Cache images illisible: {e}")
+            entry = None
+
+    headers = {}
+    if entry:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
     try:
-        async with session.get(url, timeout=aiohttp.ClientTimeout(total=30)) as resp:
+        async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=30)) as resp:
+            if resp.status == 304 and entry:
+                cached = image_cache.read(entry, fresh_until=_image_fresh_until(resp.headers))
+                if cached:
+                    logger.info(f"🗃️ Image inchangée (304), servie depuis le cache: {url[:60]}...")
+                    return cached
+                return None
             if resp.status >= 400:
                 logger.warning(f"⚠️ Échec téléchargement image (status {resp.status}): {url[:60]}...")
-                return None
+                return image_cache.read(entry) if entry else None
             data = await resp.read()
             if not data:
                 return None
-            # Nom de fichier : depuis Content-Disposition ou extrait de l'URL
-            disp = resp.headers.get("Content-Disposition")
-            filename = "image.png"
-            if disp and "filename=" in disp:
-                part = disp.split("filename=")[-1].strip().strip('"\'')
-                if part:
-                    filename = part
-            else:
-                path = url.split("?")[0].strip("/")
-                if "/" in path:
-                    name = path.split("/")[-1]
-                    if "." in name and len(name) < 200:
-                        filename = name
-            if not any(filename.lower().endswith(ext) for ext in (".png", ".jpg", ".jpeg", ".gif", ".webp")):
-                filename = filename + ".png" if "." not in filename else "image.png"
+            filename = _image_filename(url, resp.headers)
             ctype = resp.headers.get("Content-Type") or "image/png"
             if ";" in ctype:
                 ctype = ctype.split(";")[0].strip()
+            data, filename, ctype = await image_normalizer.normalize(data, filename, ctype)
+            if config.IMAGE_CACHE_ENABLED:
+                try:
+                    image_cache.store(
+                        url, data, filename, ctype,
+                        resp.headers.get("ETag"), resp.headers.get("Last-Modified"), _image_fresh_until(resp.headers),
+                        variant
+                    )
+                except Exception as e:
+                    logger.warning(f"⚠️ Écriture cache images impossible: {e}")
             return (data, filename, ctype)
     except Exception as e:
         logger.warning(f"⚠️ Exception téléchargement image: {e}")
-        return None
+        return image_cache.read(entry) if entry else None
+
+def _attachment_form(payload: dict, file_bytes: bytes, filename: str, content_type: str) -> aiohttp.FormData:
+    """FormData payload_json + files[0] (reconstruit à chaque envoi : relance possible après 429)."""
+    form = aiohttp.FormData()
+    form.add_field("payload_json", json.dumps(payload), content_type="application/json")
+    form.add_field("files[0]", file_bytes, filename=filename, content_type=content_type)
+    return form
 
 async def _discord_post_thread_with_attachment(
     session, forum_id: str, name: str, message_content: str,
@@ -1525,12 +3094,9 @@ async def _discord_post_thread_with_attachment(
     }
     if applied_tag_ids:
         payload["applied_tags"] = applied_tag_ids
-    form = aiohttp.FormData()
-    form.add_field("payload_json", json.dumps(payload), content_type="application/json")
-    form.add_field("files[0]", file_bytes, filename=filename, content_type=content_type)
     return await _discord_request(
         session, "POST", f"/channels/{forum_id}/threads",
-        headers=_auth_headers(), data=form
+        headers=_auth_headers(), data=lambda: _attachment_form(payload, file_bytes, filename, content_type)
     )
 
 async def _discord_patch_message_with_attachment(
@@ -1546,12 +3112,9 @@ async def _discord_patch_message_with_attachment(
         "embeds": [],
         "attachments": [{"id": 0, "filename": filename}]
     }
-    form = aiohttp.FormData()
-    form.add_field("payload_json", json.dumps(payload), content_type="application/json")
-    form.add_field("files[0]", file_bytes, filename=filename, content_type=content_type)
     status, data, headers = await _discord_request(
         session, "PATCH", f"/channels/{thread_id}/messages/{message_id}",
-        headers=_auth_headers(), data=form
+        headers=_auth_headers(), data=lambda: _attachment_form(payload, file_bytes, filename, content_type)
     )
     return status, data
 
@@ -1568,6 +3131,50 @@ async def _discord_delete_message(session, channel_id: str, message_id: str):
     return status < 300
 
 
+# Discord : bulk-delete accepte 2 à 100 messages, tous de moins de 14 jours (marge d'une heure)
+DISCORD_EPOCH_MS = 1420070400000
+BULK_DELETE_MAX = 100
+BULK_DELETE_MAX_AGE_SECONDS = 14 * 86400 - 3600
+
+def _snowflake_age_seconds(snowflake) -> float:
+    """Âge (en secondes) d'un ID Discord, d'après l'horodatage contenu dans le snowflake."""
+    created_ms = (int(snowflake) >> 22) + DISCORD_EPOCH_MS
+    return time.time() - created_ms / 1000
+
+async def _discord_bulk_delete_messages(session, channel_id: str, message_ids: List[str]) -> int:
+    """
+    Supprime des messages d'un channel/thread en un minimum de requêtes :
+    blocs de 100 via POST bulk-delete pour les messages de moins de 14 jours,
+    DELETE unitaire pour les plus anciens (ou un message récent isolé).
+    Returns:
+        Nombre de messages supprimés
+    """
+    recent, single = [], []
+    for msg_id in message_ids:
+        (recent if _snowflake_age_seconds(msg_id) < BULK_DELETE_MAX_AGE_SECONDS else single).append(msg_id)
+    deleted = 0
+    for i in range(0, len(recent), BULK_DELETE_MAX):
+        chunk = recent[i:i + BULK_DELETE_MAX]
+        if len(chunk) < 2:
+            single.extend(chunk)
+            continue
+        status, data, _ = await _discord_request(
+            session, "POST", f"/channels/{channel_id}/messages/bulk-delete",
+            headers={**_auth_headers(), "Content-Type": "application/json"},
+            json_data={"messages": chunk}
+        )
+        if status < 300:
+            deleted += len(chunk)
+        else:
+            logger.warning(f"⚠️ Échec bulk-delete ({len(chunk)} messages, status={status}): {data} — repli unitaire")
+            single.extend(chunk)
+    for msg_id in single:
+        if await _discord_delete_message(session, channel_id, msg_id):
+            deleted += 1
+        else:
+            logger.warning(f"⚠️ Échec suppression message: {msg_id}")
+    return deleted
+
 async def _discord_delete_channel(session, channel_id: str) -> Tuple[bool, int]:
     """Supprime un channel/thread Discord (DELETE /channels/{channel_id}). Retourne (succès, status_code)."""
     status, data, _ = await _discord_request(
@@ -1576,6 +3183,54 @@ async def _discord_delete_channel(session, channel_id: str) -> Tuple[bool, int]:
     return (status < 300, status)
 
 
+async def _find_metadata_message_id(session, thread_id: str) -> Optional[str]:
+    """Cherche le message de métadonnées parmi les 50 derniers messages (footer metadata:v1:)."""
+    for m in await _discord_list_messages(session, thread_id, limit=50):
+        if _message_has_metadata_embed(m):
+            return m.get("id")
+    return None
+
+async def _upsert_metadata_message(session, thread_id: str, metadata_b64: str, known_message_id: str = None) -> Optional[str]:
+    """
+    Met à jour (ou crée) le message de métadonnées d'un thread, masqué (SUPPRESS_EMBEDS) dans la même requête.
+    L'id connu (historique / Supabase) est PATCHé directement ; le scan des messages n'a lieu que s'il
+    est absent ou renvoie 404.
+    Returns:
+        ID du message de métadonnées écrit, ou None si l'écriture (PATCH ou création) a échoué
+    """
+    meta_payload = _build_metadata_message_payload(metadata_b64)
+    try:
+        if known_message_id:
+            s3, d3 = await _discord_patch_json(session, f"/channels/{thread_id}/messages/{known_message_id}", meta_payload)
+            if s3 < 300:
+                return str(known_message_id)
+            if s3 != 404:
+                # Échec sans certitude sur l'état du message : l'appelant garde l'id et l'empreinte précédents
+                logger.warning(f"⚠️ Échec update metadata message (status={s3}): {d3}")
+                return None
+            logger.info(f"ℹ️ Message metadata {known_message_id} introuvable (404), recherche dans le thread {thread_id}")
+
+        metadata_message_id = await _find_metadata_message_id(session, thread_id)
+        if metadata_message_id:
+            # Mettre à jour le message existant
+            s3, d3 = await _discord_patch_json(session, f"/channels/{thread_id}/messages/{metadata_message_id}", meta_payload)
+            if s3 >= 300:
+                # Même règle que l'id connu : pas d'id renvoyé, l'appelant n'enregistre pas la nouvelle empreinte
+                logger.warning(f"⚠️ Échec update metadata message (status={s3}): {d3}")
+                return None
+            # Supprimer les autres anciens messages de métadonnées (s'il y en a)
+            await _delete_old_metadata_messages(session, thread_id, keep_message_id=str(metadata_message_id))
+            return str(metadata_message_id)
+
+        # Créer un nouveau message de métadonnées
+        s2, d2, _ = await _discord_post_json(session, f"/channels/{thread_id}/messages", meta_payload)
+        if s2 < 300 and isinstance(d2, dict) and d2.get("id"):
+            return str(d2["id"])
+        logger.warning(f"⚠️ Échec création metadata message (status={s2}): {d2}")
+    except Exception as e:
+        logger.warning(f"⚠️ Exception update/création metadata message: {e}")
+    return None
+
 async def _delete_old_metadata_messages(session, thread_id: str, keep_message_id: str = None):
     """
     Supprime tous les anciens messages de métadonnées dans un thread.
@@ -1604,11 +3259,8 @@ async def _delete_old_metadata_messages(session, thread_id: str, keep_message_id
                 continue
             
             # Vérifier si c'est un message de métadonnées
-            for e in (m.get("embeds") or []):
-                footer = (e.get("footer") or {}).get("text") or ""
-                if footer.startswith("metadata:v1:") or footer.startswith("metadata:"):
-                    metadata_messages.append(msg_id)
-                    break
+            if _message_has_metadata_embed(m):
+                metadata_messages.append(msg_id)
         
         # Supprimer tous les anciens messages de métadonnées
         deleted_count = 0
@@ -1675,85 +3327,94 @@ def _is_message_thread_name_change(msg_dict: dict) -> bool:
     return False
 
 
-async def _clean_empty_messages_in_thread(session, thread_id: str) -> int:
+async def _clean_empty_messages_in_thread(session, thread_id: str, after_message_id: Optional[str] = None) -> Optional[int]:
     """
     Supprime dans un thread :
     - les messages vides (pas de contenu, pièce jointe ni embed utile) ;
     - les messages "X a changé le titre du post" (type CHANNEL_NAME_CHANGE ou contenu similaire).
     Sauf le message de départ et les messages contenant les métadonnées.
-    L'API renvoie les messages du plus récent au plus ancien ; le dernier de la liste est le message de départ.
+    Sans after_message_id : les 50 derniers messages (du plus récent au plus ancien ; le dernier est le message de départ).
+    Avec after_message_id (watermark) : uniquement les messages postérieurs, paginés par 100.
     Returns:
-        Nombre de messages supprimés
+        Nombre de messages supprimés, ou None si la lecture a échoué (watermark à ne pas avancer)
     """
     try:
-        messages = await _discord_list_messages(session, thread_id, limit=50)
-        if len(messages) <= 1:
-            return 0
-        # Ne jamais supprimer le message de départ (le plus ancien = dernier de la liste)
-        starter_id = messages[-1].get("id") if messages else None
+        if after_message_id:
+            messages = []
+            after = after_message_id
+            while True:
+                page = await _discord_list_messages(session, thread_id, limit=100, after=after, strict=True)
+                if page is None:
+                    return None
+                messages.extend(page)
+                if len(page) < 100:
+                    break
+                after = max((m.get("id") for m in page if m.get("id")), key=int)
+            # Message de départ d'un post de forum : même ID que le thread
+            starter_id = thread_id
+            candidates = messages
+        else:
+            messages = await _discord_list_messages(session, thread_id, limit=50, strict=True)
+            if messages is None:
+                return None
+            if len(messages) <= 1:
+                return 0
+            # Ne jamais supprimer le message de départ (le plus ancien = dernier de la liste)
+            starter_id = messages[-1].get("id") if messages else None
+            candidates = messages[:-1]
         to_delete = []
-        for m in messages[:-1]:
+        for m in candidates:
             msg_id = m.get("id")
-            if not msg_id or msg_id == starter_id:
+            if not msg_id or msg_id == starter_id or msg_id == thread_id:
                 continue
             if _is_message_empty_and_not_metadata(m) or _is_message_thread_name_change(m):
                 to_delete.append(msg_id)
-        deleted = 0
-        for msg_id in to_delete:
-            # Délai entre chaque suppression (0.5-1 seconde)
-            if deleted > 0:
-                await asyncio.sleep(0.5 + random.random() * 0.5)
-            
-            if await _discord_delete_message(session, thread_id, msg_id):
-                deleted += 1
-                logger.info(f"🗑️ Message vide ou « titre changé » supprimé: {msg_id} (thread {thread_id})")
-            else:
-                logger.warning(f"⚠️ Échec suppression message: {msg_id}")
+        if not to_delete:
+            return 0
+        deleted = await _discord_bulk_delete_messages(session, thread_id, to_delete)
+        if deleted:
+            logger.info(f"🗑️ {deleted} message(s) vide(s) ou « titre changé » supprimé(s) (thread {thread_id})")
         return deleted
     except Exception as e:
         logger.warning(f"⚠️ Exception nettoyage messages vides (thread {thread_id}): {e}")
-        return 0
-
-async def _discord_suppress_embeds(session, channel_id: str, message_id: str) -> bool:
-    try:
-        status, msg = await _discord_get(session, f"/channels/{channel_id}/messages/{message_id}")
-        if status >= 300:
-            logger.warning(f"⚠️ Impossible de lire le message avant SUPPRESS_EMBEDS (status={status}): {msg}")
-            return False
-
-        new_flags = (msg.get("flags", 0) | 4)
-
-        status, data = await _discord_patch_json(
-            session,
-            f"/channels/{channel_id}/messages/{message_id}",
-            {"flags": new_flags}
-        )
-        if status >= 300:
-            logger.warning(f"⚠️ Impossible de SUPPRESS_EMBEDS (status={status}): {data}")
-            return False
+        return None
 
-        return True
-    except Exception as e:
-        logger.warning(f"⚠️ Exception SUPPRESS_EMBEDS: {e}")
-        return False
+async def _forum_tag_index(session, forum_id) -> Optional[Dict[str, int]]:
+    """Tags du forum {nom en minuscules: id} : cache mémoire, puis cache gateway, puis REST en dernier recours."""
+    index = forum_tag_cache.get(forum_id)
+    if index is not None:
+        return index
+    forum = bot.get_channel(int(forum_id)) if str(forum_id).isdigit() else None
+    if isinstance(forum, discord.ForumChannel):
+        return forum_tag_cache.set(forum_id, forum.available_tags)
+    status, ch = await _discord_get(session, f"/channels/{forum_id}")
+    if status >= 300 or not isinstance(ch, dict):
+        return None
+    return forum_tag_cache.set(forum_id, ch.get("available_tags", []))
 
 async def _resolve_applied_tag_ids(session, forum_id, tags_raw):
     wanted = [t.strip() for t in (tags_raw or "").replace(';', ',').replace('|', ',').split(',') if t.strip()]
     if not wanted: return []
-    status, ch = await _discord_get(session, f"/channels/{forum_id}")
-    if status >= 300: return []
-    available = ch.get("available_tags", [])
+    index = await _forum_tag_index(session, forum_id)
+    if index is None: return []
     applied = []
     for w in wanted:
         if w.isdigit():
             applied.append(int(w))
-        else:
-            for t in available:
-                if t.get("name", "").lower() == w.lower():
-                    applied.append(int(t["id"]))
-                    break
+        elif w.lower() in index:
+            applied.append(index[w.lower()])
     return list(dict.fromkeys(applied))
 
+# URL d'image dans le contenu d'un post (y compris query string complète)
+_RE_CONTENT_IMAGE_URL = re.compile(
+    r"https?://[^\s<>\"']+\.(?:jpg|jpeg|png|gif|webp|avif|bmp|svg|ico|tiff|tif)(?:\?[^\s<>\"']*)?",
+    re.IGNORECASE
+)
+
+def _first_image_url(content: str) -> Optional[str]:
+    m = _RE_CONTENT_IMAGE_URL.search(content or "")
+    return m.group(0) if m else None
+
 def _strip_image_url_from_content(content: str, image_url: str) -> str:
     """Retire l'URL d'image du contenu (lien et retours à la ligne autour)."""
     final_content = content or " "
@@ -1772,30 +3433,22 @@ async def _create_forum_post(session, forum_id, title, content, tags_raw, images
     """
     applied_tag_ids = await _resolve_applied_tag_ids(session, forum_id, tags_raw)
 
-    # Détecter une URL d'image dans le contenu (y compris query string complète)
-    image_exts = r"(?:jpg|jpeg|png|gif|webp|avif|bmp|svg|ico|tiff|tif)"
-    image_url_pattern = re.compile(
-        rf"https?://[^\s<>\"']+\.{image_exts}(?:\?[^\s<>\"']*)?",
-        re.IGNORECASE
-    )
-    image_urls_full = [m.group(0) for m in image_url_pattern.finditer(content or "")]
-
-    final_content = content or " "
+    # Détecter une URL d'image dans le contenu (même règle que le diff des mises à jour)
+    final_content, image_url = _discord_message_content(content)
     use_attachment = False
     file_bytes, filename, content_type = None, "image.png", "image/png"
+    image_hash = None
 
-    if image_urls_full:
-        image_url = image_urls_full[0]
+    if image_url:
         # Télécharger l'image et l'envoyer en pièce jointe (au lieu d'embed)
-        fetched = await _fetch_image_from_url(session, image_url)
+        fetched = await _fetch_image_from_url(http_sessions.get("web"), image_url)
         if fetched:
             file_bytes, filename, content_type = fetched
-            final_content = _strip_image_url_from_content(content or " ", image_url)
             use_attachment = True
+            image_hash = _image_hash(file_bytes)
             logger.info(f"✅ Image en pièce jointe (message principal): {image_url[:60]}...")
         else:
             # Fallback : embed si le téléchargement échoue
-            final_content = _strip_image_url_from_content(content or " ", image_url)
             logger.info(f"⚠️ Téléchargement image échoué, fallback embed: {image_url[:60]}...")
 
     if use_attachment and file_bytes:
@@ -1806,8 +3459,8 @@ async def _create_forum_post(session, forum_id, title, content, tags_raw, images
     else:
         # Sans image ou fallback embed
         message_embeds = []
-        if image_urls_full and not use_attachment:
-            message_embeds.append({"image": {"url": image_urls_full[0]}})
+        if image_url and not use_attachment:
+            message_embeds.append({"image": {"url": image_url}})
         message_payload = {"content": final_content or " ", "embeds": message_embeds}
         payload = {"name": title, "message": message_payload}
         if applied_tag_ids:
@@ -1833,23 +3486,19 @@ async def _create_forum_post(session, forum_id, title, content, tags_raw, images
     thread_id = str(thread_id) if thread_id is not None else None
     message_id = str(message_id) if message_id is not None else None
 
-    # Publier les métadonnées dans un 2e message puis SUPPRESS_EMBEDS sur ce 2e message
+    # Publier les métadonnées dans un 2e message créé directement avec SUPPRESS_EMBEDS
     # Structure: Message 1 = contenu + image, Message 2 = métadonnées
+    metadata_message_id = None
     if metadata_b64 and thread_id:
         try:
             if len(metadata_b64) > 25000:
                 logger.warning("⚠️ metadata_b64 trop long, metadata message ignoré pour éviter un 400 Discord")
             else:
-                # Supprimer tous les anciens messages de métadonnées avant d'en créer un nouveau
-                await _delete_old_metadata_messages(session, str(thread_id))
-                
-                meta_payload = {
-                    "content": " ",
-                    "embeds": [_build_metadata_embed(metadata_b64)]
-                }
+                # Thread neuf : aucun ancien message de métadonnées à chercher
+                meta_payload = _build_metadata_message_payload(metadata_b64)
                 s2, d2, _ = await _discord_post_json(session, f"/channels/{thread_id}/messages", meta_payload)
                 if s2 < 300 and isinstance(d2, dict) and d2.get("id"):
-                    await _discord_suppress_embeds(session, str(thread_id), str(d2["id"]))
+                    metadata_message_id = str(d2["id"])
                 else:
                     logger.warning(f"⚠️ Échec création message metadata (status={s2}): {d2}")
         except Exception as e:
@@ -1858,6 +3507,10 @@ async def _create_forum_post(session, forum_id, title, content, tags_raw, images
     return True, {
         "thread_id": thread_id,
         "message_id": message_id,
+        "metadata_message_id": metadata_message_id,
+        "image_hash": image_hash,
+        "content_hash": _content_hash(final_content or " "),
+        "image_url": image_url,
         "guild_id": data.get("guild_id"),
         "thread_url": f"https://discord.com/channels/{data.get('guild_id')}/{thread_id}"
     }
@@ -1868,8 +3521,7 @@ def _with_cors(request, resp):
     return resp
 
 
-async def _send_announcement(
-    session,
+def _queue_announcement(
     is_update: bool,
     title: str,
     thread_url: str,
@@ -1878,14 +3530,14 @@ async def _send_announcement(
     game_version: str,
     translate_version: str,
     image_url: Optional[str] = None,
-) -> bool:
+    thread_id=None,
+) -> Optional[Dict]:
     """
-    Envoie l'annonce (nouvelle traduction ou mise à jour) dans PUBLISHER_ANNOUNCE_CHANNEL_ID.
+    Met en file l'annonce (nouvelle traduction ou mise à jour) pour PUBLISHER_ANNOUNCE_CHANNEL_ID.
     Format défini : titre, nom du jeu (lien), traducteur, versions, état, Bon jeu à vous 😊, embed image.
+    Returns:
+        {"id", "status": "pending"} de l'outbox, ou None si non mise en file
     """
-    if not config.PUBLISHER_ANNOUNCE_CHANNEL_ID:
-        logger.warning("⚠️ PUBLISHER_ANNOUNCE_CHANNEL_ID non configuré, annonce non envoyée")
-        return False
     title_clean = (title or "").strip() or "Sans titre"
     game_version = (game_version or "").strip() or "Non spécifiée"
     translate_version = (translate_version or "").strip() or "Non spécifiée"
@@ -1902,31 +3554,18 @@ async def _send_announcement(
     payload = {"content": msg_content}
     if image_url and image_url.strip().startswith("http"):
         payload["embeds"] = [{"color": 0x4ADE80, "image": {"url": image_url.strip()}}]
-    status, data, _ = await _discord_post_json(
-        session,
-        f"/channels/{config.PUBLISHER_ANNOUNCE_CHANNEL_ID}/messages",
-        payload,
-    )
-    if status >= 300:
-        logger.warning(f"⚠️ Échec envoi annonce (status={status}): {data}")
-        return False
-    logger.info(f"✅ Annonce envoyée ({'mise à jour' if is_update else 'nouvelle traduction'}): {title_clean}")
-    return True
+    return announcement_outbox.enqueue("update" if is_update else "new", payload, thread_id=thread_id, title=title_clean)
 
 
-async def _send_deletion_announcement(
-    session,
+def _queue_deletion_announcement(
     title: str,
     reason: str = None,
-) -> bool:
+    thread_id=None,
+) -> Optional[Dict]:
     """
-    Envoie une annonce de suppression de post dans PUBLISHER_ANNOUNCE_CHANNEL_ID.
+    Met en file une annonce de suppression de post pour PUBLISHER_ANNOUNCE_CHANNEL_ID.
     Format : titre du post supprimé, raison si fournie.
     """
-    if not config.PUBLISHER_ANNOUNCE_CHANNEL_ID:
-        logger.warning("⚠️ PUBLISHER_ANNOUNCE_CHANNEL_ID non configuré, annonce de suppression non envoyée")
-        return False
-    
     title_clean = (title or "").strip() or "Publication"
     reason_clean = (reason or "").strip()
     
@@ -1945,24 +3584,12 @@ async def _send_deletion_announcement(
             }
         }]
     }
-    
-    status, data, _ = await _discord_post_json(
-        session,
-        f"/channels/{config.PUBLISHER_ANNOUNCE_CHANNEL_ID}/messages",
-        payload,
-    )
-    
-    if status >= 300:
-        logger.warning(f"⚠️ Échec envoi annonce suppression (status={status}): {data}")
-        return False
-    
-    logger.info(f"✅ Annonce de suppression envoyée: {title_clean}")
-    return True
+    return announcement_outbox.enqueue("delete", payload, thread_id=thread_id, title=title_clean)
 
 
 # ==================== HANDLERS HTTP ====================
 async def health(request):
-    return _with_cors(request, web.json_response({"ok": True, "configured": config.configured, "rate_limit": rate_limiter.get_info()}))
+    return _with_cors(request, web.json_response({"ok": True, "configured": config.configured, "rate_limit": rate_limiter.get_info(), "announcements": announcement_outbox.get_info()}))
 
 async def options_handler(request):
     return _with_cors(request, web.Response(status=204))
@@ -1978,353 +3605,576 @@ async def configure(request):
         logger.error(f"Erreur configuration: {e}")
         return _with_cors(request, web.json_response({"ok": False, "error": str(e)}, status=400))
 
-async def forum_post(request):
-    """Handler pour publier un post dans le salon my uniquement."""
-    api_key = request.headers.get("X-API-KEY") or request.query.get("api_key")
-    if api_key != config.PUBLISHER_API_KEY:
-        return _with_cors(request, web.json_response({"ok": False, "error": "Invalid API key"}, status=401))
-    if not config.FORUM_MY_ID:
-        return _with_cors(request, web.json_response({"ok": False, "error": "PUBLISHER_FORUM_TRAD_ID non configuré"}, status=500))
-    title, content, tags, metadata_b64 = "", "", "", None
-    translator_label, state_label, game_version, translate_version, announce_image_url = "", "", "", "", ""
-    history_payload_raw = None
+# Champs multipart de /api/forum-post (même nom côté frontend)
+FORUM_POST_FIELDS = (
+    "title", "content", "tags", "metadata", "translator_label", "state_label",
+    "game_version", "translate_version", "announce_image_url", "history_payload",
+)
+
+async def _read_multipart_fields(request, names) -> Dict[str, str]:
+    """Lit les champs texte multipart attendus (valeurs strip) ; les autres parties sont ignorées."""
+    fields: Dict[str, str] = {}
     reader = await request.multipart()
     async for part in reader:
-        if part.name == "title":
-            title = (await part.text()).strip()
-        elif part.name == "content":
-            content = (await part.text()).strip()
-        elif part.name == "tags":
-            tags = (await part.text()).strip()
-        elif part.name == "metadata":
-            metadata_b64 = (await part.text()).strip()
-        elif part.name == "translator_label":
-            translator_label = (await part.text()).strip()
-        elif part.name == "state_label":
-            state_label = (await part.text()).strip()
-        elif part.name == "game_version":
-            game_version = (await part.text()).strip()
-        elif part.name == "translate_version":
-            translate_version = (await part.text()).strip()
-        elif part.name == "announce_image_url":
-            announce_image_url = (await part.text()).strip()
-        elif part.name == "history_payload":
-            history_payload_raw = (await part.text()).strip()
-    forum_id = config.FORUM_MY_ID
-
-    async with aiohttp.ClientSession() as session:
-        ok, result = await _create_forum_post(session, forum_id, title, content, tags, [], metadata_b64)
-        if ok and config.PUBLISHER_ANNOUNCE_CHANNEL_ID:
-            await _send_announcement(
-                session,
-                is_update=False,
-                title=title,
-                thread_url=result.get("thread_url", ""),
-                translator_label=translator_label,
-                state_label=state_label,
-                game_version=game_version,
-                translate_version=translate_version,
-                image_url=announce_image_url or None,
-            )
+        if part.name in names:
+            fields[part.name] = (await part.text()).strip()
+    return fields
+
+def _wants_async(request, fields: Dict[str, str]) -> bool:
+    """Mode asynchrone (202 + job) : ?async=1, champ multipart async=true ou en-tête Prefer: respond-async."""
+    flag = (request.query.get("async") or fields.get("async") or "").strip().lower()
+    return flag in ("true", "1", "yes") or "respond-async" in (request.headers.get("Prefer") or "")
+
+async def _publish_forum_thread(session, fields: Dict[str, str], progress=None) -> Tuple[bool, Dict]:
+    """Partie Discord d'une publication : thread (+ image, métadonnées) puis mise en file de l'annonce."""
+    def step(name: str):
+        if progress:
+            progress(name)
+
+    title = fields.get("title", "")
+    step("thread")
+    ok, result = await _create_forum_post(
+        session, config.FORUM_MY_ID, title, fields.get("content", ""), fields.get("tags", ""), [],
+        fields.get("metadata") or None
+    )
+    if ok and config.PUBLISHER_ANNOUNCE_CHANNEL_ID:
+        step("announcement")
+        result["announcement"] = _queue_announcement(
+            is_update=False,
+            title=title,
+            thread_url=result.get("thread_url", ""),
+            translator_label=fields.get("translator_label", ""),
+            state_label=fields.get("state_label", ""),
+            game_version=fields.get("game_version", ""),
+            translate_version=fields.get("translate_version", ""),
+            image_url=fields.get("announce_image_url") or None,
+            thread_id=result.get("thread_id"),
+        )
+    return ok, result
 
-    if not ok:
-        return _with_cors(request, web.json_response({"ok": False, "details": result}, status=500))
+def _discord_message_content(content: str) -> Tuple[str, Optional[str]]:
+    """(texte envoyé à Discord pour le message principal, URL de l'image de couverture retirée du texte)."""
+    image_url = _first_image_url(content)
+    if image_url:
+        return _strip_image_url_from_content(content or " ", image_url) or " ", image_url
+    return content or " ", None
+
+def _content_hash(message_content: str) -> str:
+    """
+    Empreinte du texte réellement envoyé à Discord (colonne content_hash, base du diff des mises à jour) :
+    la colonne content est réécrite par le frontend et ne reflète pas le message publié.
+    """
+    return hashlib.sha1((message_content or "").encode("utf-8")).hexdigest()
+
+def _image_hash(file_bytes: bytes) -> str:
+    """Empreinte de l'image envoyée en pièce jointe (colonne image_hash : ré-upload évité si identique)."""
+    return hashlib.sha256(file_bytes).hexdigest()
+
+# Champs des métadonnées renouvelés à chaque envoi (frontend, _metadata_from_row) : exclus de l'empreinte
+METADATA_VOLATILE_KEYS = ("timestamp",)
 
+def _metadata_hash(metadata_b64: Optional[str]) -> Optional[str]:
+    """
+    Empreinte des métadonnées publiées (colonne metadata_hash, base du diff des mises à jour) :
+    JSON décodé sans les champs volatils, sérialisé en forme canonique (clés triées).
+    """
+    if not metadata_b64:
+        return None
+    try:
+        metadata = _decode_metadata_b64(metadata_b64)
+    except Exception:
+        metadata = None
+    if isinstance(metadata, dict):
+        stable = {k: v for k, v in metadata.items() if k not in METADATA_VOLATILE_KEYS}
+        canonical = json.dumps(stable, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    else:
+        # Métadonnées illisibles : empreinte du base64 brut
+        canonical = metadata_b64
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+def _build_history_row(fields: Dict[str, str], result: Dict) -> Dict:
+    """
+    Ligne d'historique d'un post publié : history_payload du frontend complété des infos du thread,
+    ou ligne minimale si le payload est absent ou invalide.
+    """
+    now = datetime.datetime.now(ZoneInfo("UTC")).isoformat()
+    metadata_hash = _metadata_hash(fields.get("metadata")) if result.get("metadata_message_id") else None
+    history_payload_raw = fields.get("history_payload") or None
     if history_payload_raw:
         try:
-            payload = json.loads(history_payload_raw)
+            payload = json.loads(history_payload_raw) if isinstance(history_payload_raw, str) else dict(history_payload_raw)
             payload["thread_id"] = result.get("thread_id") or ""
             payload["message_id"] = result.get("message_id") or ""
+            payload["metadata_message_id"] = result.get("metadata_message_id")
+            payload["metadata_hash"] = metadata_hash
+            payload["image_hash"] = result.get("image_hash")
+            payload["content_hash"] = result.get("content_hash")
+            payload["image_url"] = result.get("image_url")
             payload["discord_url"] = result.get("thread_url") or ""
-            payload["forum_id"] = forum_id
-            ts = int(time.time() * 1000)
+            payload["forum_id"] = config.FORUM_MY_ID
             if "created_at" not in payload or not payload.get("created_at"):
-                payload["created_at"] = datetime.datetime.now(ZoneInfo("UTC")).isoformat()
-            payload["updated_at"] = datetime.datetime.now(ZoneInfo("UTC")).isoformat()
+                payload["created_at"] = now
+            payload["updated_at"] = now
             if "timestamp" not in payload:
-                payload["timestamp"] = ts
-            history_manager.update_or_add_post(payload)
-            
-            # 🔥 SAUVEGARDER DANS SUPABASE (source de vérité)
-            sb = _get_supabase()
-            if sb:
-                try:
-                    # Supprimer les champs qui ne sont pas dans la table Supabase
-                    supabase_payload = {k: v for k, v in payload.items() if k not in ['timestamp', 'template']}
-                    res = sb.table("published_posts").upsert(supabase_payload, on_conflict="id").execute()
-                    logger.info(f"✅ Post enregistré dans Supabase: {payload.get('title')}")
-                except Exception as e:
-                    logger.warning(f"⚠️ Échec sauvegarde Supabase lors de la création: {e}")
+                payload["timestamp"] = int(time.time() * 1000)
+            return payload
         except Exception as e:
             logger.warning(f"Historique (create): payload invalide, fallback minimal: {e}")
-            fallback_payload = {
-                "id": f"post_{int(time.time())}",
-                "timestamp": int(time.time() * 1000),
-                "title": title,
-                "content": content,
-                "tags": tags,
-                "template": "my",
-                "thread_id": result["thread_id"],
-                "message_id": result["message_id"],
-                "discord_url": result["thread_url"],
-                "forum_id": forum_id,
-            }
-            history_manager.update_or_add_post(fallback_payload)
-            
-            # 🔥 SAUVEGARDER DANS SUPABASE (fallback)
-            sb = _get_supabase()
-            if sb:
+    return {
+        "id": f"post_{int(time.time() * 1000)}_{uuid.uuid4().hex[:8]}",
+        "timestamp": int(time.time() * 1000),
+        "title": fields.get("title", ""),
+        "content": fields.get("content", ""),
+        "tags": fields.get("tags", ""),
+        "template": "my",
+        "thread_id": result["thread_id"],
+        "message_id": result["message_id"],
+        "metadata_message_id": result.get("metadata_message_id"),
+        "metadata_hash": metadata_hash,
+        "image_hash": result.get("image_hash"),
+        "content_hash": result.get("content_hash"),
+        "image_url": result.get("image_url"),
+        "discord_url": result["thread_url"],
+        "forum_id": config.FORUM_MY_ID,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+async def _persist_history_rows(rows: List[Dict]) -> None:
+    """Écrit les lignes dans l'historique local (une seule écriture) puis dans Supabase (un seul upsert)."""
+    if not rows:
+        return
+    history_manager.update_or_add_posts(rows)
+    for row in rows:
+        _index_post(row["thread_id"], row, row.get("title") or "", save=False)
+    thread_index.save()
+
+    # 🔥 SAUVEGARDER DANS SUPABASE (source de vérité)
+    sb = _get_supabase()
+    if sb:
+        # Supprimer les champs qui ne sont pas dans la table Supabase
+        supabase_rows = [{k: v for k, v in row.items() if k not in ['timestamp', 'template']} for row in rows]
+        try:
+            await asyncio.get_event_loop().run_in_executor(
+                None, lambda: sb.table("published_posts").upsert(supabase_rows, on_conflict="id").execute()
+            )
+            logger.info(f"✅ {len(rows)} post(s) enregistré(s) dans Supabase")
+        except Exception as e:
+            logger.warning(f"⚠️ Échec sauvegarde Supabase de {len(rows)} post(s): {e}")
+
+# Nom de thread Discord : 1 à 100 caractères
+DISCORD_THREAD_NAME_MAX = 100
+
+def _validate_forum_post_fields(fields: Dict[str, str]) -> Optional[str]:
+    """Contrôles synchrones avant publication (ou mise en file d'un job). Returns: message d'erreur, None si valide."""
+    title = fields.get("title", "")
+    if not title:
+        return "title requis"
+    if len(title) > DISCORD_THREAD_NAME_MAX:
+        return f"title trop long (max {DISCORD_THREAD_NAME_MAX} caractères)"
+    if not fields.get("content"):
+        return "content requis"
+    return None
+
+async def _run_forum_post(fields: Dict[str, str], progress=None) -> Tuple[bool, Dict]:
+    """
+    Pipeline complet de publication (thread, métadonnées, annonce, historique, Supabase).
+    Partagé par le mode synchrone et les jobs asynchrones.
+    Returns:
+        (ok, result) — result = infos du thread si ok, détails de l'erreur sinon
+    """
+    async with http_sessions.use("discord") as session:
+        ok, result = await _publish_forum_thread(session, fields, progress=progress)
+    if not ok:
+        return False, result
+    if progress:
+        progress("history")
+    await _persist_history_rows([_build_history_row(fields, result)])
+    return True, result
+
+async def forum_post(request):
+    """Handler pour publier un post dans le salon my uniquement."""
+    api_key = request.headers.get("X-API-KEY") or request.query.get("api_key")
+    if api_key != config.PUBLISHER_API_KEY:
+        return _with_cors(request, web.json_response({"ok": False, "error": "Invalid API key"}, status=401))
+    if not config.FORUM_MY_ID:
+        return _with_cors(request, web.json_response({"ok": False, "error": "PUBLISHER_FORUM_TRAD_ID non configuré"}, status=500))
+    fields = await _read_multipart_fields(request, FORUM_POST_FIELDS + ("async", "idempotency_key"))
+    wants_async = _wants_async(request, fields)
+    idempotency_key = _idempotency_key(request, fields)
+    fields = {k: v for k, v in fields.items() if k not in ("async", "idempotency_key")}
+    # Validé avant la mise en file : un job ne doit pas être accepté (202) pour échouer ensuite
+    error = _validate_forum_post_fields(fields)
+    if error:
+        return _with_cors(request, web.json_response({"ok": False, "error": error}, status=400))
+
+    async def publish() -> Tuple[int, Dict]:
+        if wants_async:
+            job = publish_jobs.submit("forum_post", fields)
+            return 202, {"ok": True, "job_id": job["id"], "status": job["status"], "status_url": f"/api/jobs/{job['id']}"}
+        ok, result = await _run_forum_post(fields)
+        if not ok:
+            return 500, {"ok": False, "details": result}
+        return 200, {"ok": True, **result}
+
+    status, body, replayed = await idempotency_store.run("forum_post", idempotency_key, publish)
+    return _idempotent_response(request, status, body, replayed)
+
+BATCH_PUBLISH_MAX_POSTS = 50
+
+def _batch_spec_fields(spec: Dict, names=FORUM_POST_FIELDS) -> Dict[str, str]:
+    """Champs d'un élément du lot, au format des champs multipart de l'endpoint unitaire."""
+    fields = {}
+    for name in names:
+        value = spec.get(name)
+        if value is None:
+            continue
+        if name == "history_payload" and not isinstance(value, str):
+            value = json.dumps(value, ensure_ascii=False)
+        fields[name] = str(value).strip()
+    return fields
+
+async def _run_forum_post_batch(fields_list: List[Dict[str, str]]) -> Dict:
+    """
+    Publie un lot : tags résolus une fois, threads créés en parallèle, puis une seule écriture
+    d'historique et un seul upsert Supabase pour tous les posts publiés.
+    """
+    sem = asyncio.Semaphore(config.BATCH_PUBLISH_CONCURRENCY)
+
+    async with http_sessions.use("discord") as session:
+        # Tags du forum chargés une fois pour tout le lot (cache partagé par _resolve_applied_tag_ids)
+        await _forum_tag_index(session, config.FORUM_MY_ID)
+
+        async def publish_one(fields: Dict[str, str]) -> Tuple[bool, Dict]:
+            async with sem:
                 try:
-                    supabase_fallback = {k: v for k, v in fallback_payload.items() if k not in ['timestamp', 'template']}
-                    supabase_fallback["created_at"] = datetime.datetime.now(ZoneInfo("UTC")).isoformat()
-                    supabase_fallback["updated_at"] = datetime.datetime.now(ZoneInfo("UTC")).isoformat()
-                    res = sb.table("published_posts").upsert(supabase_fallback, on_conflict="id").execute()
-                    logger.info(f"✅ Post (fallback) enregistré dans Supabase: {title}")
-                except Exception as e2:
-                    logger.warning(f"⚠️ Échec sauvegarde Supabase fallback: {e2}")
-    else:
-        fallback_payload = {
-            "id": f"post_{int(time.time())}",
-            "timestamp": int(time.time() * 1000),
-            "title": title,
-            "content": content,
-            "tags": tags,
-            "template": "my",
-            "thread_id": result["thread_id"],
-            "message_id": result["message_id"],
-            "discord_url": result["thread_url"],
-            "forum_id": forum_id,
-        }
-        history_manager.update_or_add_post(fallback_payload)
-        
-        # 🔥 SAUVEGARDER DANS SUPABASE
-        sb = _get_supabase()
-        if sb:
-            try:
-                supabase_fallback = {k: v for k, v in fallback_payload.items() if k not in ['timestamp', 'template']}
-                supabase_fallback["created_at"] = datetime.datetime.now(ZoneInfo("UTC")).isoformat()
-                supabase_fallback["updated_at"] = datetime.datetime.now(ZoneInfo("UTC")).isoformat()
-                res = sb.table("published_posts").upsert(supabase_fallback, on_conflict="id").execute()
-                logger.info(f"✅ Post (no payload) enregistré dans Supabase: {title}")
-            except Exception as e:
-                logger.warning(f"⚠️ Échec sauvegarde Supabase no payload: {e}")
+                    return await _publish_forum_thread(session, fields)
+                except Exception as e:
+                    logger.error(f"❌ Lot: échec publication {fields.get('title', '')}: {e}")
+                    return False, {"error": f"{type(e).__name__}: {e}"}
 
-    return _with_cors(request, web.json_response({"ok": True, **result}))
+        outcomes = await asyncio.gather(*(publish_one(f) for f in fields_list))
 
-async def forum_post_update(request):
-    """Handler pour mettre à jour un post (salon my uniquement)."""
+    rows = [_build_history_row(f, result) for f, (ok, result) in zip(fields_list, outcomes) if ok]
+    await _persist_history_rows(rows)
+
+    results = []
+    for i, (ok, result) in enumerate(outcomes):
+        results.append({"index": i, "ok": True, **result} if ok else {"index": i, "ok": False, "details": result})
+    published = sum(1 for ok, _ in outcomes if ok)
+    logger.info(f"📦 Lot publié: {published}/{len(fields_list)} post(s)")
+    return {"ok": published == len(fields_list), "count": len(fields_list), "published": published, "results": results}
+
+async def forum_post_batch(request):
+    """Handler pour publier plusieurs posts en une requête (JSON {"posts": [...]}, mêmes champs que /api/forum-post)."""
     api_key = request.headers.get("X-API-KEY") or request.query.get("api_key")
     if api_key != config.PUBLISHER_API_KEY:
         return _with_cors(request, web.json_response({"ok": False, "error": "Invalid API key"}, status=401))
     if not config.FORUM_MY_ID:
         return _with_cors(request, web.json_response({"ok": False, "error": "PUBLISHER_FORUM_TRAD_ID non configuré"}, status=500))
-    
-    title, content, tags, thread_id, message_id, metadata_b64 = "", "", "", None, None, None
-    translator_label, state_label, game_version, translate_version, announce_image_url, thread_url = "", "", "", "", "", ""
-    history_payload_raw = None
-    silent_update = False
+    try:
+        data = await request.json()
+    except Exception:
+        return _with_cors(request, web.json_response({"ok": False, "error": "JSON invalide"}, status=400))
+    specs = data.get("posts") if isinstance(data, dict) else data
+    if not isinstance(specs, list) or not specs or not all(isinstance(p, dict) for p in specs):
+        return _with_cors(request, web.json_response({"ok": False, "error": "posts: liste d'objets requise"}, status=400))
+    if len(specs) > BATCH_PUBLISH_MAX_POSTS:
+        return _with_cors(request, web.json_response(
+            {"ok": False, "error": f"Maximum {BATCH_PUBLISH_MAX_POSTS} posts par lot"}, status=400
+        ))
+    fields_list = [_batch_spec_fields(p) for p in specs]
+    invalid = {i: error for i, error in enumerate(map(_validate_forum_post_fields, fields_list)) if error}
+    if invalid:
+        return _with_cors(request, web.json_response(
+            {"ok": False, "error": "posts invalides", "invalid": [{"index": i, "error": e} for i, e in invalid.items()]},
+            status=400
+        ))
+
+    async def publish() -> Tuple[int, Dict]:
+        return 200, await _run_forum_post_batch(fields_list)
+
+    status, body, replayed = await idempotency_store.run("forum_post_batch", _idempotency_key(request, {}), publish)
+    return _idempotent_response(request, status, body, replayed)
+
+async def get_job(request):
+    """Statut d'un job de publication asynchrone (étape en cours, résultat final ou erreur)."""
+    api_key = request.headers.get("X-API-KEY") or request.query.get("api_key")
+    if api_key != config.PUBLISHER_API_KEY:
+        return _with_cors(request, web.json_response({"ok": False, "error": "Invalid API key"}, status=401))
+    job = publish_jobs.get(request.match_info["job_id"])
+    if not job:
+        return _with_cors(request, web.json_response({"ok": False, "error": "Job introuvable"}, status=404))
+    return _with_cors(request, web.json_response({"ok": True, "job": job}))
+
+# Champs multipart de /api/forum-post/update
+FORUM_POST_UPDATE_FIELDS = (
+    "silent_update", "title", "content", "tags", "threadId", "messageId", "metadata", "translator_label",
+    "state_label", "game_version", "translate_version", "announce_image_url", "thread_url", "history_payload",
+)
 
-    reader = await request.multipart()
-    async for part in reader:
-        if part.name == "silent_update":
-            val = (await part.text()).strip().lower()
-            silent_update = val in ("true", "1", "yes")
-        elif part.name == "title":
-            title = (await part.text()).strip()
-        elif part.name == "content":
-            content = (await part.text()).strip()
-        elif part.name == "tags":
-            tags = (await part.text()).strip()
-        elif part.name == "threadId":
-            thread_id = (await part.text()).strip()
-        elif part.name == "messageId":
-            message_id = (await part.text()).strip()
-        elif part.name == "metadata":
-            metadata_b64 = (await part.text()).strip()
-        elif part.name == "translator_label":
-            translator_label = (await part.text()).strip()
-        elif part.name == "state_label":
-            state_label = (await part.text()).strip()
-        elif part.name == "game_version":
-            game_version = (await part.text()).strip()
-        elif part.name == "translate_version":
-            translate_version = (await part.text()).strip()
-        elif part.name == "announce_image_url":
-            announce_image_url = (await part.text()).strip()
-        elif part.name == "thread_url":
-            thread_url = (await part.text()).strip()
-        elif part.name == "history_payload":
-            history_payload_raw = (await part.text()).strip()
+async def _run_update_steps(steps: Dict[str, Callable[[], Awaitable[Optional[Dict]]]], timeout: float) -> Dict[str, Dict]:
+    """
+    Lance des étapes indépendantes en parallèle, chacune bornée par `timeout` secondes.
+    Une étape renvoie None si elle a réussi, sinon un dict décrivant l'échec.
+    Returns:
+        {nom de l'étape: rapport d'erreur} pour les seules étapes en échec
+    """
+    async def run(name: str, step) -> Optional[Dict]:
+        started = time.monotonic()
+        try:
+            error = await asyncio.wait_for(step(), timeout=timeout or None)
+        except asyncio.TimeoutError:
+            error = {"error": "timeout", "timeout_seconds": timeout}
+        except Exception as e:
+            error = {"error": str(e) or type(e).__name__}
+        if error is not None:
+            error.setdefault("elapsed_ms", int((time.monotonic() - started) * 1000))
+            logger.warning(f"⚠️ Étape {name} en échec: {error}")
+        return error
 
-    if not thread_id or not message_id:
-        return _with_cors(request, web.json_response({"ok": False, "error": "threadId and messageId required"}, status=400))
+    names = list(steps)
+    results = await asyncio.gather(*(run(name, steps[name]) for name in names))
+    return {name: error for name, error in zip(names, results) if error is not None}
 
-    logger.info(f"🔄 Mise à jour post: {title} (thread: {thread_id})")
 
-    async with aiohttp.ClientSession() as session:
-        message_path = f"/channels/{thread_id}/messages/{message_id}"
+async def _run_forum_post_update(fields: Dict[str, str], deferred_rows: Optional[List[Dict]] = None) -> Tuple[int, Dict]:
+    """
+    Pipeline de mise à jour d'un post : message, métadonnées et titre/tags en parallèle,
+    puis historique local, Supabase et mise en file de l'annonce.
+    Avec `deferred_rows` (MAJ en masse), la ligne d'historique y est ajoutée au lieu d'être écrite :
+    l'appelant l'enregistre avec les autres via _persist_history_rows.
+    Returns:
+        (status HTTP, corps JSON de la réponse)
+    """
+    title = fields.get("title", "")
+    content = fields.get("content", "")
+    tags = fields.get("tags", "")
+    thread_id = fields.get("threadId") or None
+    message_id = fields.get("messageId") or None
+    metadata_b64 = fields.get("metadata") or None
+    translator_label = fields.get("translator_label", "")
+    state_label = fields.get("state_label", "")
+    game_version = fields.get("game_version", "")
+    translate_version = fields.get("translate_version", "")
+    announce_image_url = fields.get("announce_image_url", "")
+    thread_url = fields.get("thread_url", "")
+    history_payload_raw = fields.get("history_payload") or None
+    silent_update = fields.get("silent_update", "").lower() in ("true", "1", "yes")
 
-        # Détecter une URL d'image dans le contenu (y compris query string complète)
-        image_exts = r"(?:jpg|jpeg|png|gif|webp|avif|bmp|svg|ico|tiff|tif)"
-        image_url_pattern = re.compile(
-            rf"https?://[^\s<>\"']+\.{image_exts}(?:\?[^\s<>\"']*)?",
-            re.IGNORECASE
-        )
-        image_urls_full = [m.group(0) for m in image_url_pattern.finditer(content or "")]
+    if not thread_id or not message_id:
+        return 400, {"ok": False, "error": "threadId and messageId required"}
 
-        final_content = content or " "
-        use_attachment = False
-        file_bytes, filename, content_type = None, "image.png", "image/png"
+    logger.info(f"🔄 Mise à jour post: {title} (thread: {thread_id})")
 
-        if image_urls_full:
-            image_url = image_urls_full[0]
-            fetched = await _fetch_image_from_url(session, image_url)
+    # Ligne existante (Supabase, sinon historique local) : base du diff, fusion finale, id du message metadata
+    loop = asyncio.get_event_loop()
+    existing_row = await loop.run_in_executor(None, _fetch_post_by_thread_id_sync, thread_id)
+    known_row = existing_row or history_manager.find_by_thread_id(thread_id) or {}
+
+    # Diff avec l'état enregistré : seules les cibles modifiées sont réécrites sur Discord.
+    # Ligne absente ou autre message de départ : tout est réécrit.
+    # Base du diff possédée par le serveur (content_hash, image_url) : la colonne content est réécrite par le frontend
+    same_post = bool(known_row) and str(known_row.get("message_id") or "") == str(message_id)
+    final_content, image_url = _discord_message_content(content)
+    content_hash = _content_hash(final_content)
+    content_changed = not same_post or known_row.get("content_hash") != content_hash
+    image_changed = not same_post or (known_row.get("image_url") or None) != image_url
+    # Image effectivement sur Discord après message_step (URL connue conservée si le téléchargement échoue)
+    written_image_url = known_row.get("image_url") or None
+    message_written = False
+    metadata_hash = _metadata_hash(metadata_b64)
+    metadata_message_id = known_row.get("metadata_message_id") or None
+    # Posé par metadata_step une fois Discord écrit : seule condition pour enregistrer id et empreinte
+    metadata_written = False
+    image_hash = None
+    metadata_changed = bool(metadata_b64) and (
+        not same_post or not metadata_message_id or known_row.get("metadata_hash") != metadata_hash
+    )
+    thread_changed = not same_post or (known_row.get("title") or "") != title or (known_row.get("tags") or "") != tags
+    changed = [name for name, flag in (
+        ("content", content_changed), ("image", image_changed), ("metadata", metadata_changed), ("thread", thread_changed)
+    ) if flag]
+    if not changed:
+        logger.info(f"⏭️ Aucun changement Discord pour {title}, écritures ignorées")
+
+    # Étapes Discord indépendantes (message, métadonnées, titre/tags) lancées en parallèle, chacune avec son délai.
+    # L'annonce et la persistance n'attendent que la réussite du message et du thread.
+    session = http_sessions.get("discord")
+    message_path = f"/channels/{thread_id}/messages/{message_id}"
+
+    async def message_step() -> Optional[Dict]:
+        nonlocal image_hash, written_image_url, message_written
+        fetched = None
+        image_applied = not image_changed or not image_url
+        if image_url and image_changed:
+            fetched = await _fetch_image_from_url(http_sessions.get("web"), image_url)
             if fetched:
-                file_bytes, filename, content_type = fetched
-                final_content = _strip_image_url_from_content(content or " ", image_url)
-                use_attachment = True
+                image_applied = True
                 logger.info(f"✅ Image en pièce jointe (update message principal): {image_url[:60]}...")
             else:
-                final_content = _strip_image_url_from_content(content or " ", image_url)
                 logger.info(f"⚠️ Téléchargement image échoué (update), pas de nouvelle image")
 
-        if use_attachment and file_bytes:
+        if fetched and same_post and known_row.get("image_hash") == _image_hash(fetched[0]):
+            # Même image (autre URL ou même fichier) : pièce jointe existante conservée, pas de ré-upload
+            logger.info(f"⏭️ Image identique à la pièce jointe actuelle, upload ignoré: {image_url[:60]}...")
+            fetched = None
+
+        if fetched:
+            file_bytes, filename, content_type = fetched
+            image_hash = _image_hash(file_bytes)
             status, data = await _discord_patch_message_with_attachment(
                 session, str(thread_id), str(message_id), final_content or " ",
                 file_bytes, filename, content_type
             )
         else:
-            # Mise à jour du contenu uniquement (sans nouvelle image ; pas d'embed)
+            # Mise à jour du contenu uniquement (pièce jointe existante conservée ; pas d'embed)
             message_payload = {"content": final_content or " ", "embeds": []}
             status, data = await _discord_patch_json(session, message_path, message_payload)
-
         if status >= 300:
-            return _with_cors(request, web.json_response({"ok": False, "details": data}, status=500))
+            return {"status": status, "details": data}
+        message_written = True
+        if image_applied:
+            written_image_url = image_url
+        return None
 
-        # Mettre à jour/créer le message metadata séparé (et le SUPPRESS)
+    async def metadata_step() -> Optional[Dict]:
+        # Message metadata séparé (masqué via SUPPRESS_EMBEDS)
         # Structure: Message 1 = contenu + image, Message 2 = métadonnées
-        if metadata_b64:
-            try:
-                if len(metadata_b64) > 25000:
-                    logger.warning("⚠️ metadata_b64 trop long, metadata message ignoré pour éviter un 400 Discord")
-                else:
-                    messages = await _discord_list_messages(session, str(thread_id), limit=50)
-                    metadata_message_id = None
-                    for m in messages:
-                        for e in (m.get("embeds") or []):
-                            footer = (e.get("footer") or {}).get("text") or ""
-                            if footer.startswith("metadata:v1:") or footer.startswith("metadata:"):
-                                metadata_message_id = m.get("id")
-                                break
-                        if metadata_message_id:
-                            break
-
-                    meta_payload = {"content": " ", "embeds": [_build_metadata_embed(metadata_b64)]}
-                    if metadata_message_id:
-                        # Mettre à jour le message existant
-                        s3, d3 = await _discord_patch_json(session, f"/channels/{thread_id}/messages/{metadata_message_id}", meta_payload)
-                        if s3 < 300:
-                            await _discord_suppress_embeds(session, str(thread_id), str(metadata_message_id))
-                            # Supprimer les autres anciens messages de métadonnées (s'il y en a)
-                            await _delete_old_metadata_messages(session, str(thread_id), keep_message_id=str(metadata_message_id))
-                        else:
-                            logger.warning(f"⚠️ Échec update metadata message (status={s3}): {d3}")
-                    else:
-                        # Supprimer tous les anciens messages de métadonnées avant d'en créer un nouveau
-                        await _delete_old_metadata_messages(session, str(thread_id))
-                        
-                        # Créer un nouveau message de métadonnées
-                        s2, d2, _ = await _discord_post_json(session, f"/channels/{thread_id}/messages", meta_payload)
-                        if s2 < 300 and isinstance(d2, dict) and d2.get("id"):
-                            await _discord_suppress_embeds(session, str(thread_id), str(d2["id"]))
-                        else:
-                            logger.warning(f"⚠️ Échec création metadata message (status={s2}): {d2}")
-            except Exception as e:
-                logger.warning(f"⚠️ Exception update/création metadata message: {e}")
+        nonlocal metadata_message_id, metadata_written
+        if len(metadata_b64) > 25000:
+            logger.warning("⚠️ metadata_b64 trop long, metadata message ignoré pour éviter un 400 Discord")
+            return {"error": "metadata too long"}
+        written_id = await _upsert_metadata_message(
+            session, str(thread_id), metadata_b64, known_message_id=metadata_message_id
+        )
+        if not written_id:
+            return {"error": "metadata upsert failed"}
+        # Délai dépassé avant ce point : tâche annulée, id et empreinte connus conservés
+        metadata_message_id, metadata_written = written_id, True
+        return None
 
-        # Mettre à jour le titre et les tags du thread
+    async def thread_step() -> Optional[Dict]:
         applied_tag_ids = await _resolve_applied_tag_ids(session, config.FORUM_MY_ID, tags)
         status, data = await _discord_patch_json(session, f"/channels/{thread_id}", {
             "name": title,
             "applied_tags": applied_tag_ids
         })
+        return {"status": status, "details": data} if status >= 300 else None
+
+    steps = {}
+    if content_changed or image_changed:
+        steps["message"] = message_step
+    if metadata_changed:
+        steps["metadata"] = metadata_step
+    if thread_changed:
+        steps["thread"] = thread_step
+    errors = await _run_update_steps(steps, config.UPDATE_STEP_TIMEOUT_SECONDS)
+
+    # Message et thread sont requis ; un échec metadata est seulement signalé
+    failed = [name for name in ("message", "thread") if name in errors]
+    if failed:
+        logger.error(f"❌ Mise à jour {title} en échec ({', '.join(sorted(errors))})")
+        return 500, {
+            "ok": False,
+            "details": errors[failed[0]].get("details", errors[failed[0]]),
+            "errors": errors,
+            "changed": changed,
+        }
 
-        if status >= 300:
-            return _with_cors(request, web.json_response({"ok": False, "details": data}, status=500))
-
-        if config.PUBLISHER_ANNOUNCE_CHANNEL_ID and thread_url and not silent_update:
-            await _send_announcement(
-                session,
-                is_update=True,
-                title=title,
-                thread_url=thread_url,
-                translator_label=translator_label,
-                state_label=state_label,
-                game_version=game_version,
-                translate_version=translate_version,
-                image_url=announce_image_url or None,
-            )
-        elif silent_update:
-            logger.info(f"🔇 Mise à jour silencieuse (sans annonce): {title}")
-
-        # 🔥 RECONSTRUCTION DU PAYLOAD COMPLET POUR L'HISTORIQUE
-        ts = int(time.time() * 1000)
-        
-        # Récupérer l'entrée existante depuis Supabase pour fusionner
-        loop = asyncio.get_event_loop()
-        existing_row = await loop.run_in_executor(None, _fetch_post_by_thread_id_sync, thread_id)
-        
-        if history_payload_raw:
-            try:
-                payload = json.loads(history_payload_raw)
-            except Exception as e:
-                logger.warning(f"⚠️ Payload JSON invalide, création minimal: {e}")
-                payload = {}
-        else:
+    # 🔥 RECONSTRUCTION DU PAYLOAD COMPLET POUR L'HISTORIQUE
+    ts = int(time.time() * 1000)
+    
+    if history_payload_raw:
+        try:
+            payload = json.loads(history_payload_raw)
+        except Exception as e:
+            logger.warning(f"⚠️ Payload JSON invalide, création minimal: {e}")
             payload = {}
-        
-        # Fusionner avec les données existantes (si trouvées)
-        if existing_row:
-            # Garder les champs non modifiés de l'ancien post
-            final_payload = dict(existing_row)  # Copie de l'existant
-            # Écraser avec les nouvelles valeurs du payload
-            final_payload.update(payload)
-        else:
-            final_payload = payload
-        
-        # Forcer les champs reçus (priorité aux nouvelles valeurs)
-        final_payload["thread_id"] = thread_id
-        final_payload["message_id"] = message_id
-        final_payload["discord_url"] = (thread_url or "").strip() or final_payload.get("discord_url") or ""
-        final_payload["title"] = title
-        final_payload["content"] = content
-        final_payload["tags"] = tags
-        final_payload["updated_at"] = datetime.datetime.now(ZoneInfo("UTC")).isoformat()
-        
-        # S'assurer que created_at existe
-        if "created_at" not in final_payload or not final_payload.get("created_at"):
-            final_payload["created_at"] = datetime.datetime.now(ZoneInfo("UTC")).isoformat()
-        
-        # Normaliser le payload (snake_case)
-        final_payload = _normalize_history_row(final_payload)
-        
-        # Sauvegarder dans l'historique
+    else:
+        payload = {}
+    
+    # Fusionner avec les données existantes (Supabase, sinon historique local)
+    if known_row:
+        # Garder les champs non modifiés de l'ancien post
+        final_payload = dict(known_row)  # Copie de l'existant
+        # Écraser avec les nouvelles valeurs du payload
+        final_payload.update(payload)
+    else:
+        final_payload = payload
+    
+    # Forcer les champs reçus (priorité aux nouvelles valeurs)
+    final_payload["thread_id"] = thread_id
+    final_payload["message_id"] = message_id
+    # Métadonnées non écrites (inchangées, échec, délai dépassé) : valeurs connues conservées via la fusion
+    if metadata_written:
+        final_payload["metadata_message_id"] = metadata_message_id
+        final_payload["metadata_hash"] = metadata_hash
+    if image_hash:
+        final_payload["image_hash"] = image_hash
+    # Message non réécrit (inchangé) : content_hash / image_url connus conservés via la fusion
+    if message_written:
+        final_payload["content_hash"] = content_hash
+        final_payload["image_url"] = written_image_url
+    final_payload["discord_url"] = (thread_url or "").strip() or final_payload.get("discord_url") or ""
+    final_payload["title"] = title
+    final_payload["content"] = content
+    final_payload["tags"] = tags
+    final_payload["updated_at"] = datetime.datetime.now(ZoneInfo("UTC")).isoformat()
+    
+    # S'assurer que created_at existe
+    if "created_at" not in final_payload or not final_payload.get("created_at"):
+        final_payload["created_at"] = datetime.datetime.now(ZoneInfo("UTC")).isoformat()
+    
+    # Normaliser le payload (snake_case)
+    final_payload = _normalize_history_row(final_payload)
+    
+    # Sauvegarder dans l'historique (sauf écriture groupée par l'appelant)
+    if deferred_rows is None:
         history_manager.update_or_add_post(final_payload)
-        
+        _index_post(thread_id, final_payload, title)
+    else:
+        deferred_rows.append(final_payload)
+    
+    async def supabase_step() -> Optional[Dict]:
         # 🔥 SAUVEGARDER DANS SUPABASE (source de vérité)
         sb = _get_supabase()
-        if sb:
-            try:
-                # Supprimer les clamps qui ne sont pas dans la table Supabase
-                supabase_payload = {k: v for k, v in final_payload.items() if k not in ['timestamp', 'template']}
-                res = sb.table("published_posts").upsert(supabase_payload, on_conflict="id").execute()
-                logger.info(f"✅ Post enregistré dans Supabase: {final_payload.get('title')}")
-            except Exception as e:
-                logger.warning(f"⚠️ Échec sauvegarde Supabase lors de la mise à jour: {e}")
+        if not sb:
+            return None
+        # Supprimer les clamps qui ne sont pas dans la table Supabase
+        supabase_payload = {k: v for k, v in final_payload.items() if k not in ['timestamp', 'template']}
+        await loop.run_in_executor(
+            None, lambda: sb.table("published_posts").upsert(supabase_payload, on_conflict="id").execute()
+        )
+        logger.info(f"✅ Post enregistré dans Supabase: {final_payload.get('title')}")
+        return None
+
+    # Annonce livrée en arrière-plan par l'outbox (la réponse n'attend pas le salon d'annonce)
+    announcement = None
+    if config.PUBLISHER_ANNOUNCE_CHANNEL_ID and thread_url and not silent_update:
+        announcement = _queue_announcement(
+            is_update=True,
+            title=title,
+            thread_url=thread_url,
+            translator_label=translator_label,
+            state_label=state_label,
+            game_version=game_version,
+            translate_version=translate_version,
+            image_url=announce_image_url or None,
+            thread_id=thread_id,
+        )
+    elif silent_update:
+        logger.info(f"🔇 Mise à jour silencieuse (sans annonce): {title}")
+    if deferred_rows is None:
+        errors.update(await _run_update_steps({"supabase": supabase_step}, config.UPDATE_STEP_TIMEOUT_SECONDS))
 
-    return _with_cors(request, web.json_response({
+    return 200, {
         "ok": True, 
         "updated": True, 
+        "changed": changed,
+        # Étapes non bloquantes en échec (metadata, supabase)
+        "errors": errors,
+        "announcement": announcement,
         "thread_id": thread_id,
         "message_id": message_id,
         "thread_url": thread_url,
@@ -2336,13 +4186,128 @@ async def forum_post_update(request):
         "threadUrl": thread_url,
         "discordUrl": thread_url,
         "forumId": config.FORUM_MY_ID or 0
-    }))
+    }
+
+async def forum_post_update(request):
+    """Handler pour mettre à jour un post (salon my uniquement)."""
+    api_key = request.headers.get("X-API-KEY") or request.query.get("api_key")
+    if api_key != config.PUBLISHER_API_KEY:
+        return _with_cors(request, web.json_response({"ok": False, "error": "Invalid API key"}, status=401))
+    if not config.FORUM_MY_ID:
+        return _with_cors(request, web.json_response({"ok": False, "error": "PUBLISHER_FORUM_TRAD_ID non configuré"}, status=500))
+    fields = await _read_multipart_fields(request, FORUM_POST_UPDATE_FIELDS + ("idempotency_key",))
+    status, body, replayed = await idempotency_store.run(
+        "forum_post_update", _idempotency_key(request, fields), lambda: _run_forum_post_update(fields)
+    )
+    return _idempotent_response(request, status, body, replayed)
+
+BATCH_UPDATE_MAX_POSTS = 1000
+# MAJ en masse : lignes d'historique écrites (JSON local, index, Supabase) par paquets de cette taille
+BATCH_UPDATE_FLUSH_SIZE = 100
+# Lots en cours (tâches détachées du handler) : référence forte jusqu'à leur fin
+_update_batch_tasks: set = set()
+
+async def forum_post_update_batch(request):
+    """
+    Handler de MAJ en masse (JSON {"posts": [...]}, mêmes champs que /api/forum-post/update).
+    Toujours silencieux (pas d'annonce). Progression renvoyée en NDJSON : une ligne par post terminé
+    ({"index", "ok", "status", ...}) puis une ligne finale {"done": true, ...}.
+    """
+    api_key = request.headers.get("X-API-KEY") or request.query.get("api_key")
+    if api_key != config.PUBLISHER_API_KEY:
+        return _with_cors(request, web.json_response({"ok": False, "error": "Invalid API key"}, status=401))
+    if not config.FORUM_MY_ID:
+        return _with_cors(request, web.json_response({"ok": False, "error": "PUBLISHER_FORUM_TRAD_ID non configuré"}, status=500))
+    try:
+        data = await request.json()
+    except Exception:
+        return _with_cors(request, web.json_response({"ok": False, "error": "JSON invalide"}, status=400))
+    specs = data.get("posts") if isinstance(data, dict) else data
+    if not isinstance(specs, list) or not specs or not all(isinstance(p, dict) for p in specs):
+        return _with_cors(request, web.json_response({"ok": False, "error": "posts: liste d'objets requise"}, status=400))
+    if len(specs) > BATCH_UPDATE_MAX_POSTS:
+        return _with_cors(request, web.json_response(
+            {"ok": False, "error": f"Maximum {BATCH_UPDATE_MAX_POSTS} posts par lot"}, status=400
+        ))
+
+    resp = web.StreamResponse(headers={"Content-Type": "application/x-ndjson; charset=utf-8"})
+    _with_cors(request, resp)
+    await resp.prepare(request)
+    client_gone = False
+
+    async def emit(line: Dict):
+        nonlocal client_gone
+        if client_gone:
+            return
+        try:
+            await resp.write((json.dumps(line, ensure_ascii=False, default=str) + "\n").encode("utf-8"))
+        except (ConnectionError, RuntimeError):
+            # Client parti : les MAJ continuent, seule la progression n'est plus envoyée
+            client_gone = True
+            logger.warning("⚠️ MAJ en masse: client déconnecté, poursuite sans progression")
+
+    queue: asyncio.Queue = asyncio.Queue()
+    for i, spec in enumerate(specs):
+        fields = _batch_spec_fields(spec, FORUM_POST_UPDATE_FIELDS)
+        fields["silent_update"] = "true"
+        queue.put_nowait((i, fields))
+    counts = {"updated": 0, "failed": 0}
+    started_at = time.monotonic()
+    # Une réécriture de publication_history.json par paquet et non par post
+    pending_rows: List[Dict] = []
+
+    async def flush():
+        # Vidée sur place : les MAJ en cours gardent une référence à la même liste
+        rows = pending_rows[:]
+        pending_rows.clear()
+        await _persist_history_rows(rows)
+
+    async def worker():
+        while True:
+            try:
+                i, fields = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                status, body = await _run_forum_post_update(fields, deferred_rows=pending_rows)
+                if len(pending_rows) >= BATCH_UPDATE_FLUSH_SIZE:
+                    await flush()
+            except Exception as e:
+                logger.error(f"❌ MAJ en masse: échec post {fields.get('threadId')}: {e}")
+                status, body = 500, {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            counts["updated" if status < 300 else "failed"] += 1
+            await emit({"index": i, "thread_id": fields.get("threadId"), "status": status, **body})
+
+    async def run_batch():
+        await asyncio.gather(*(worker() for _ in range(min(config.BATCH_UPDATE_CONCURRENCY, len(specs)))))
+        await flush()
+        logger.info(
+            f"📦 MAJ en masse terminée: {counts['updated']}/{len(specs)} post(s) en {time.monotonic() - started_at:.1f}s"
+        )
+        await emit({"done": True, "count": len(specs), **counts})
+
+    # Tâche détachée : une déconnexion du client annule le handler, pas les MAJ en cours
+    batch = asyncio.ensure_future(run_batch())
+    _update_batch_tasks.add(batch)
+    batch.add_done_callback(_update_batch_tasks.discard)
+    await asyncio.shield(batch)
+    if not client_gone:
+        await resp.write_eof()
+    return resp
 
 async def get_history(request):
     api_key = request.headers.get("X-API-KEY") or request.query.get("api_key")
     if api_key != config.PUBLISHER_API_KEY:
         return _with_cors(request, web.json_response({"ok": False, "error": "Invalid API key"}, status=401))
     posts = history_manager.get_posts()
+    # État de livraison de la dernière annonce de chaque post (pending / sent / failed)
+    try:
+        deliveries = announcement_outbox.status_by_thread()
+    except Exception as e:
+        logger.warning(f"⚠️ Lecture de l'outbox des annonces impossible: {e}")
+        deliveries = {}
+    for post in posts:
+        post["announcement"] = deliveries.get(post.get("thread_id") or "")
     return _with_cors(request, web.json_response({"ok": True, "posts": posts, "count": len(posts)}))
 
 
@@ -2380,7 +4345,7 @@ async def forum_post_delete(request):
             await loop.run_in_executor(None, _delete_from_supabase_sync, None, post_id)
         return _with_cors(request, web.json_response({"ok": True, "skipped_discord": True}))
     
-    async with aiohttp.ClientSession() as session:
+    async with http_sessions.use("discord") as session:
         deleted, status = await _discord_delete_channel(session, thread_id)
         
         if not deleted:
@@ -2388,6 +4353,8 @@ async def forum_post_delete(request):
                 logger.info(f"ℹ️ Thread déjà supprimé: {thread_id}")
                 # Supprimer quand même de l'historique et Supabase
                 history_manager.delete_post(thread_id=thread_id)
+                thread_index.remove(thread_id)
+                forum_thread_cache.discard(thread_id)
                 # 🔥 SUPPRESSION SUPABASE
                 loop = asyncio.get_event_loop()
                 await loop.run_in_executor(None, _delete_from_supabase_sync, thread_id, post_id)
@@ -2397,14 +4364,16 @@ async def forum_post_delete(request):
         
         # Supprimer de l'historique
         history_manager.delete_post(thread_id=thread_id)
+        thread_index.remove(thread_id)
+        forum_thread_cache.discard(thread_id)
         
         # 🔥 SUPPRESSION SUPABASE
         loop = asyncio.get_event_loop()
         await loop.run_in_executor(None, _delete_from_supabase_sync, thread_id, post_id)
         
-        # 🔥 Envoyer l'annonce de suppression dans le salon Discord
+        # 🔥 Mettre en file l'annonce de suppression (livrée en arrière-plan)
         if post_title:  # Seulement si on a un titre
-            await _send_deletion_announcement(session, post_title, reason)
+            _queue_deletion_announcement(post_title, reason, thread_id=thread_id)
     
     logger.info(f"✅ Post supprimé complètement: {post_title or thread_id}")
     return _with_cors(request, web.json_response({"ok": True, "thread_id": thread_id}))
@@ -2414,8 +4383,11 @@ app = web.Application()
 app.add_routes([
     web.get('/api/publisher/health', health),
     web.post('/api/forum-post', forum_post),
+    web.post('/api/forum-post/batch', forum_post_batch),
     web.post('/api/forum-post/update', forum_post_update),
+    web.post('/api/forum-post/update/batch', forum_post_update_batch),
     web.post('/api/forum-post/delete', forum_post_delete),
+    web.get('/api/jobs/{job_id}', get_job),
     web.get('/api/history', get_history),
     web.post('/api/configure', configure),
     web.options('/{tail:.*}', options_handler)
@@ -2432,11 +4404,20 @@ async def start_web_server():
 
 async def main():
     """Point d'entrée principal - Lance bot Discord + API REST en parallèle"""
-    # Lancer le serveur web
-    await start_web_server()
-    
-    # Lancer le bot Discord
-    await bot.start(config.PUBLISHER_DISCORD_TOKEN)
+    await http_sessions.start()
+    await publish_jobs.start()
+    await announcement_outbox.start()
+    try:
+        # Lancer le serveur web
+        await start_web_server()
+        
+        # Lancer le bot Discord
+        await bot.start(config.PUBLISHER_DISCORD_TOKEN)
+    finally:
+        await publish_jobs.close()
+        await announcement_outbox.close()
+        image_normalizer.close()
+        await http_sessions.close()
 
 if __name__ == '__main__':
     from discord.http import Route
@@ -0,0 +1,6 @@
+-- Colonne metadata_message_id : id du 2e message (embed métadonnées masqué) du thread Discord.
+-- Le bot le PATCHe directement au lieu de lister les messages du thread (scan seulement si 404).
+ALTER TABLE public.published_posts
+  ADD COLUMN IF NOT EXISTS metadata_message_id text;
+
+COMMENT ON COLUMN public.published_posts.metadata_message_id IS 'ID Discord du message de métadonnées (message_id = message de départ).';
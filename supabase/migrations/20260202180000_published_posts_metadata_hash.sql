@@ -0,0 +1,6 @@
+-- Colonne metadata_hash : empreinte (sha1) des métadonnées écrites dans le message de métadonnées (JSON canonique, hors timestamp).
+-- /api/forum-post/update compare l'empreinte reçue et ne réécrit le message que si elle a changé.
+ALTER TABLE public.published_posts
+  ADD COLUMN IF NOT EXISTS metadata_hash text;
+
+COMMENT ON COLUMN public.published_posts.metadata_hash IS 'SHA-1 du JSON canonique des dernières métadonnées publiées sur Discord, hors timestamp (mise à jour différentielle).';
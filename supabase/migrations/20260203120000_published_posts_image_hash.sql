@@ -0,0 +1,6 @@
+-- Colonne image_hash : empreinte (sha256) de l'image envoyée en pièce jointe du message principal.
+-- /api/forum-post/update compare l'empreinte de l'image téléchargée et conserve la pièce jointe existante si elle est identique.
+ALTER TABLE public.published_posts
+  ADD COLUMN IF NOT EXISTS image_hash text;
+
+COMMENT ON COLUMN public.published_posts.image_hash IS 'SHA-256 de la dernière image envoyée en pièce jointe sur Discord (ré-upload évité si identique).';
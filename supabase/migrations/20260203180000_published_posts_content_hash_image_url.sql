@@ -0,0 +1,8 @@
+-- Colonnes content_hash / image_url : base du diff de /api/forum-post/update, écrite uniquement par le serveur.
+-- content est réécrite par le frontend (sans l'URL de l'image) : la comparer ré-éditait le message à chaque mise à jour.
+ALTER TABLE public.published_posts
+  ADD COLUMN IF NOT EXISTS content_hash text,
+  ADD COLUMN IF NOT EXISTS image_url text;
+
+COMMENT ON COLUMN public.published_posts.content_hash IS 'SHA-1 du texte du message principal tel qu''envoyé à Discord (URL de l''image retirée).';
+COMMENT ON COLUMN public.published_posts.image_url IS 'URL de l''image de couverture actuellement publiée sur le message principal Discord.';